@@ -0,0 +1,202 @@
+# ################### Benchmark for the throughput and the latency of the two-phase solver ############################
+# usage example: python benchmark.py --cubes 50 --seed 1 --settings 20:10 21:10 --output results.json
+# The tables are found as described in tables.py. The JSON files of different runs can be compared across commits and
+# machines. Run it with TWOPHASE_FULL_PHASE2=1 to benchmark the complete phase 2 pruning table and with
+# TWOPHASE_EXACT_PRUNING=nibble or =byte to benchmark the pruning tables with the exact distances, see pruning.py. The
+# tables are created on the first run with these settings.
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+
+import face
+import cubie
+import solver
+import pruning
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+# fixed hard positions which are solved in every run in addition to the random cubes
+HARD_CUBES = {'superflip': cubie.CubieCube(eo=[1] * 12).to_facelet_cube().to_string()}
+
+
+def random_cubes(n, seed):
+    """Returns n uniformly distributed random cube definition strings. The same seed gives the same cubes."""
+    random.seed(seed)
+    cubes = []
+    for i in range(n):
+        cc = cubie.CubieCube()
+        cc.randomize()
+        cubes.append(cc.to_facelet_cube().to_string())
+    return cubes
+
+
+def is_solution(cubestring, solution):
+    """Checks if the solution string returned by solver.solve solves the cube."""
+    fc = face.FaceCube()
+    fc.from_string(cubestring)
+    cc = fc.to_cubie_cube()
+    for m in solution[:solution.rfind('(')].split():
+        for i in range(int(m[1])):
+            cc.multiply(cubie.basicMoveCube['URFDLB'.index(m[0])])
+    return cc.to_facelet_cube().to_string() == cubie.CubieCube().to_facelet_cube().to_string()
+
+
+def percentile(values, p):
+    """The p-th percentile of the sorted list values, nearest-rank method."""
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def peak_rss():
+    """The peak resident set size in kilobytes of this process and of its finished child processes, or None if it is
+    not available."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == 'darwin':  # macOS reports bytes
+        rss //= 1024
+    return rss
+
+
+def pruning_table_size():
+    """The memory of the phase 1 and phase 2 pruning tables in bytes."""
+    if pruning.EXACT:
+        tables = (pruning.flipslice_twist_depth, pruning.corners_ud_edges_depth)
+    else:
+        tables = (pruning.flipslice_twist_depth3, pruning.corners_ud_edges_depth3)
+    return sum(len(t) * t.itemsize for t in tables)
+
+
+def run(cubes, max_length, timeout, **solve_args):
+    """Solves all cubes with the same settings and returns the statistics. The time to the first solution of each cube
+    is only measured if the search runs in threads, the callback of solver.solve is not available for processes.
+    :param cubes: A dictionary name -> cube definition string, not empty
+    """
+    if not cubes:
+        raise ValueError('no cubes to solve')
+    latencies = []
+    first_solutions = []
+    histogram = {}
+    failures = []
+    nodes = 0
+    nodes_phase = None  # nodes of phase 1 and phase 2, only with the option count
+    start = time.perf_counter()
+    for name, cubestring in cubes.items():
+        t = time.perf_counter()
+        info = {}
+        found = []  # the elapsed times of all solutions, the first one is the time to the first solution
+        if not solve_args.get('processes'):
+            solve_args['callback'] = lambda solution, length, elapsed: found.append(elapsed)
+        solution = solver.solve(cubestring, max_length, timeout, info=info, **solve_args)
+        latencies.append(time.perf_counter() - t)
+        if found:
+            first_solutions.append(found[0])
+        nodes += info.get('nodes', 0)
+        if 'counters' in info:
+            nodes_phase = nodes_phase or [0, 0]
+            nodes_phase[0] += sum(info['counters']['nodes_phase1'])
+            nodes_phase[1] += sum(info['counters']['nodes_phase2'])
+        if solution.startswith('Error') or not is_solution(cubestring, solution):
+            failures.append(name)
+            continue
+        length = int(solution[solution.rfind('(') + 1:-2])
+        histogram[length] = histogram.get(length, 0) + 1
+    total = time.perf_counter() - start
+    latencies.sort()
+    first_solutions.sort()
+    return {'max_length': max_length,
+            'timeout': timeout,
+            'cubes': len(cubes),
+            'total_time': total,
+            'nodes': nodes,
+            'nodes_phase1': nodes_phase[0] if nodes_phase else None,
+            'nodes_phase2': nodes_phase[1] if nodes_phase else None,
+            'solves_per_sec': len(cubes) / total,
+            'latency_mean': total / len(cubes),
+            'latency_p50': percentile(latencies, 50),
+            'latency_p95': percentile(latencies, 95),
+            'latency_p99': percentile(latencies, 99),
+            'latency_max': latencies[-1],
+            'first_solution_mean': sum(first_solutions) / len(first_solutions) if first_solutions else None,
+            'first_solution_p50': percentile(first_solutions, 50) if first_solutions else None,
+            'first_solution_p95': percentile(first_solutions, 95) if first_solutions else None,
+            'length_histogram': {str(k): histogram[k] for k in sorted(histogram)},
+            'failures': failures}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark for the two-phase solver.')
+    parser.add_argument('--cubes', type=int, default=20, help='number of random cubes (default 20)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random cubes (default 0)')
+    parser.add_argument('--settings', nargs='+', default=['20:10', '21:10'], metavar='MAX_LENGTH:TIMEOUT',
+                        help='solver settings to benchmark (default 20:10 21:10)')
+    parser.add_argument('--no-hard', action='store_true', help='do not solve the fixed hard positions')
+    parser.add_argument('--processes', action='store_true', help='run the searches in processes instead of threads')
+    parser.add_argument('--kernel', default='recursive', help='search kernel, recursive, iterative or numpy (default recursive)')
+    parser.add_argument('--conj-bounds', action='store_true',
+                        help='prune phase 1 with the lower bounds of the conjugated cubes')
+    parser.add_argument('--ordered', action='store_true', help='search the children in the order of their distance')
+    parser.add_argument('--tt-size', type=int, default=0,
+                        help='size of the phase 1 transposition table per search (default 0, no table)')
+    parser.add_argument('--count', action='store_true', help='count the nodes of phase 1 and phase 2 separately')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args(argv)
+    if args.cubes < 0 or args.tt_size < 0:
+        parser.error('--cubes and --tt-size must not be negative')
+    if args.cubes == 0 and args.no_hard:
+        parser.error('no cubes to solve, use --cubes > 0 or solve the hard positions')
+
+    cubes = {'random_' + str(i): c for i, c in enumerate(random_cubes(args.cubes, args.seed))}
+    if not args.no_hard:
+        cubes.update(HARD_CUBES)
+
+    runs = []
+    for setting in args.settings:
+        max_length, timeout = setting.split(':')
+        r = run(cubes, int(max_length), float(timeout), processes=args.processes, kernel=args.kernel,
+                conj_bounds=args.conj_bounds, ordered=args.ordered, count=args.count, tt_size=args.tt_size)
+        runs.append(r)
+        print('max_length %d, timeout %g: %.2f solves/s, %d nodes, p50 %.3f s, p95 %.3f s, p99 %.3f s, lengths %s%s' %
+              (r['max_length'], r['timeout'], r['solves_per_sec'], r['nodes'], r['latency_p50'], r['latency_p95'],
+               r['latency_p99'], r['length_histogram'], ', failures ' + str(r['failures']) if r['failures'] else ''))
+        if r['nodes_phase2'] is not None:
+            print('    nodes phase 1: %d, phase 2: %d' % (r['nodes_phase1'], r['nodes_phase2']))
+        if r['first_solution_mean'] is not None:
+            print('    first solution: mean %.3f s, p50 %.3f s, p95 %.3f s' %
+                  (r['first_solution_mean'], r['first_solution_p50'], r['first_solution_p95']))
+
+    results = {'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'python': platform.python_version(),
+               'platform': platform.platform(),
+               'processor': platform.processor(),
+               'seed': args.seed,
+               'random_cubes': args.cubes,
+               'hard_cubes': [] if args.no_hard else list(HARD_CUBES),
+               'processes': args.processes,
+               'kernel': args.kernel,
+               'conj_bounds': args.conj_bounds,
+               'ordered': args.ordered,
+               'count': args.count,
+               'tt_size': args.tt_size,
+               'full_phase2': pruning.FULL_PHASE2,
+               'pruning_format': pruning.EXACT or 'depth3',
+               'pruning_table_bytes': pruning_table_size(),
+               'runs': runs,
+               'peak_rss_kb': peak_rss()}
+    print('pruning tables: %s, %.1f MB' % (results['pruning_format'], results['pruning_table_bytes'] / 1e6))
+    print('peak RSS: ' + str(results['peak_rss_kb']) + ' kB')
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(results, fh, indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# ################ Solution cache. Symmetric and antisymmetric variants of a cube share one cache entry. ##############
+
+import json
+import threading as thr
+from collections import OrderedDict
+from os import path
+
+import cubie
+import symmetries as sy
+import tables
+import enums as en
+from defs import N_SYM
+
+
+def cube_key(cc):
+    """A compact string representation of a cubie cube, e.g. '01234567000000000123456789ab000000000000' for the
+    solved cube."""
+    return ''.join('%x' % x for x in cc.cp + cc.co + cc.ep + cc.eo)
+
+
+def inverse_maneuver(man):
+    """The maneuver which undoes man."""
+    return [en.Move((m // 3) * 3 + (2 - m % 3)) for m in reversed(man)]  # R1->R3, R2->R2, R3->R1 etc.
+
+
+def canonical_form(cc):
+    """Returns (key, s, inv). key is the key of the canonical representative K, the smallest key of all cubes
+    symCube[s] * cc * symCube[s]^-1 and their inverses. K is the conjugated cube for inv = 0 and its inverse for
+    inv = 1."""
+    best = None
+    d = cubie.CubieCube()
+    for s in range(N_SYM):
+        c = cubie.CubieCube(sy.symCube[s].cp, sy.symCube[s].co, sy.symCube[s].ep, sy.symCube[s].eo)
+        c.multiply(cc)
+        c.multiply(sy.symCube[sy.inv_idx[s]])  # s*cc*s^-1
+        c.inv_cubie_cube(d)
+        for inv, k in enumerate((cube_key(c), cube_key(d))):
+            if best is None or k < best[0]:
+                best = (k, s, inv)
+    return best
+
+
+class SolutionCache:
+    """A LRU cache for solutions, keyed by the canonical representative of the cube under the 48 symmetries and
+    inversion. A solution stored for one cube is conjugated back with conj_move for all its symmetric and
+    antisymmetric variants.
+    """
+    def __init__(self, maxsize=100000, filename=None):
+        """
+        :param maxsize: The maximal number of entries. If the cache is full, the least recently used entry is removed.
+        :param filename: If not None, the cache is loaded from this file if it exists, and save() writes it back.
+        """
+        self.maxsize = maxsize
+        self.filename = filename
+        self.entries = OrderedDict()  # key of canonical cube -> maneuver which solves the canonical cube
+        self.lock = thr.Lock()
+        self.hits = 0
+        self.misses = 0
+        if filename is not None and path.isfile(filename):
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, cc):
+        """Returns a maneuver (list of moves) which solves the cubie cube cc or None if there is no cache entry."""
+        key, s, inv = canonical_form(cc)
+        with self.lock:
+            man = self.entries.get(key)
+            if man is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        if inv == 1:  # the stored maneuver solves the inverse of s*cc*s^-1
+            man = inverse_maneuver(man)
+        return [en.Move(sy.conj_move[m, sy.inv_idx[s]]) for m in man]  # s^-1*m*s solves cc
+
+    def put(self, cc, man):
+        """Stores the maneuver man which solves the cubie cube cc. An existing shorter maneuver is kept."""
+        key, s, inv = canonical_form(cc)
+        man = [en.Move(sy.conj_move[m, s]) for m in man]  # solves s*cc*s^-1
+        if inv == 1:
+            man = inverse_maneuver(man)
+        with self.lock:
+            old = self.entries.get(key)
+            if old is None or len(man) < len(old):
+                self.entries[key] = man
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)  # least recently used
+
+    def load(self):
+        """Loads the entries from the cache file."""
+        with open(self.filename) as fh:
+            data = json.load(fh)
+        with self.lock:
+            for key, man in data.items():
+                self.entries[key] = [en.Move[m] for m in man.split()]
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        """Writes the entries atomically to the cache file."""
+        with self.lock:
+            data = OrderedDict((key, ' '.join(m.name for m in man)) for key, man in self.entries.items())
+        tables.write_atomic(self.filename, lambda fh: json.dump(data, fh), 'w')
@@ -1,6 +1,5 @@
 # ####### The cube on the coordinate level is described by a 3-tuple of natural numbers in phase 1 and phase 2. ########
 
-from os import path
 import array as ar
 
 import cubie as cb
@@ -8,6 +7,7 @@ import enums
 import moves as mv
 import pruning as pr
 import symmetries as sy
+import tables as tb
 from defs import N_U_EDGES_PHASE2, N_PERM_4, N_CHOOSE_8_4, N_FLIP, N_TWIST, N_UD_EDGES, N_MOVE
 from enums import Edge as Ed
 
@@ -90,6 +90,8 @@ class CoordCube:
         flipslice = N_FLIP * slice_ + flip
         classidx = sy.flipslice_classidx[flipslice]
         sym = sy.flipslice_sym[flipslice]
+        if pr.EXACT:  # no walk down to the solved position
+            return pr.get_flipslice_twist_depth(N_TWIST * classidx + sy.twist_conj[(twist << 4) + sym])
         depth_mod3 = pr.get_flipslice_twist_depth3(N_TWIST * classidx + sy.twist_conj[(twist << 4) + sym])
 
         depth = 0
@@ -117,6 +119,9 @@ class CoordCube:
         # the slice coordinate is not included
         classidx = sy.corner_classidx[corners]
         sym = sy.corner_sym[corners]
+        if pr.EXACT:  # no walk down to the solved position
+            depth = pr.get_corners_ud_edges_depth(N_UD_EDGES * classidx + sy.ud_edges_conj[(ud_edges << 4) + sym])
+            return 11 if depth == pr.UNFILLED else depth
         depth_mod3 = pr.get_corners_ud_edges_depth3(N_UD_EDGES * classidx + sy.ud_edges_conj[(ud_edges << 4) + sym])
         if depth_mod3 == 3:  # unfilled entry, depth >= 11
             return 11
@@ -152,7 +157,8 @@ def create_phase2_edgemerge_table():
     edge_d = [Ed.DR, Ed.DF, Ed.DL, Ed.DB]
     edge_ud = [Ed.UR, Ed.UF, Ed.UL, Ed.UB, Ed.DR, Ed.DF, Ed.DL, Ed.DB]
 
-    if not path.isfile(fname):
+    u_edges_plus_d_edges_to_ud_edges = tb.load(fname, 'H', N_U_EDGES_PHASE2 * N_PERM_4)
+    if u_edges_plus_d_edges_to_ud_edges is None:
         cnt = 0
         print("creating " + fname + " table...")
         u_edges_plus_d_edges_to_ud_edges = ar.array('H', [0 for i in range(N_U_EDGES_PHASE2 * N_PERM_4)])
@@ -183,14 +189,8 @@ def create_phase2_edgemerge_table():
                         if cnt % 2000 == 0:
                             print('.', end='', flush=True)
         print()
-        fh = open(fname, "wb")
-        u_edges_plus_d_edges_to_ud_edges.tofile(fh)
-        fh.close()
+        tb.save(fname, u_edges_plus_d_edges_to_ud_edges)
         print()
-    else:
-        fh = open(fname, "rb")
-        u_edges_plus_d_edges_to_ud_edges = ar.array('H')
-        u_edges_plus_d_edges_to_ud_edges.fromfile(fh, N_U_EDGES_PHASE2 * N_PERM_4)
 ########################################################################################################################
 
 create_phase2_edgemerge_table()
@@ -0,0 +1,173 @@
+# ############ Solver daemon: loads the tables once and solves cubes for its clients over localhost HTTP/JSON ##########
+# Start the daemon with: python daemon.py [--port 8040] [--workers 4], the tables are found as described in tables.py
+#
+# POST /solve  {"cube": "<cube definition string>", "max_length": 20, "timeout": 3}  -> {"solution": "R1 U2 ... (20f)"}
+# POST /solve  {"cubes": ["<cube definition string>", ...], "max_length": 20, "timeout": 3}
+#              -> {"solutions": ["...", ...]}, a batch is solved by all workers in parallel
+# GET  /status -> {"workers": 4, "queued": 0, "running": 0, "solved": 12}
+#
+# The cubes are solved by a solver.SolverPool, so at most workers cubes are solved at the same time and the other
+# requests wait in the queue of the pool.
+
+import argparse
+import json
+import os
+import threading as thr
+import urllib.request
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8040
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    def send_json(self, code, data):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/status':
+            self.send_json(404, {'error': 'unknown path ' + self.path})
+            return
+        self.send_json(200, self.server.solver_daemon.status())
+
+    def do_POST(self):
+        if self.path != '/solve':
+            self.send_json(404, {'error': 'unknown path ' + self.path})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            if not isinstance(request, dict):
+                raise TypeError('the request is not a JSON object')
+            max_length = int(request.get('max_length', 50))
+            timeout = float(request.get('timeout', 10))
+            if 'cubes' in request:
+                cubes = request['cubes']
+                if not isinstance(cubes, list):
+                    raise TypeError('cubes is not a list')
+            else:
+                cubes = [request['cube']]
+            if not all(isinstance(c, str) for c in cubes):
+                raise TypeError('a cube is not a string')
+        except (ValueError, KeyError, TypeError, OverflowError):
+            self.send_json(400, {'error': 'the request must be a JSON object with the key cube (a string) or cubes '
+                                          '(a list of strings)'})
+            return
+        solutions = self.server.solver_daemon.solve(cubes, max_length, timeout)
+        if solutions is None:
+            self.send_json(503, {'error': 'too many queued cubes'})
+        elif 'cubes' in request:
+            self.send_json(200, {'solutions': solutions})
+        else:
+            self.send_json(200, {'solution': solutions[0]})
+
+    def log_message(self, format, *args):
+        pass  # no log line for each request
+
+
+class SolverDaemon:
+    """Serves solve requests with a SolverPool. The tables are loaded once when the daemon starts, the worker processes
+    inherit them."""
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_queued=1000):
+        """
+        :param host: The daemon only listens on this address, default is localhost
+        :param port: The TCP port
+        :param workers: The number of worker processes, i.e. the maximal number of cubes solved at the same time.
+         Default is the number of CPUs.
+        :param max_queued: Requests are rejected if more than max_queued cubes are waiting or being solved.
+        """
+        import solver  # loads or creates the tables
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = solver.SolverPool(self.workers)
+        self.max_queued = max_queued
+        self.lock = thr.Lock()
+        self.pending = 0  # cubes queued or being solved
+        self.solved = 0
+        self.server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self.server.solver_daemon = self
+
+    def solve(self, cubestrings, max_length, timeout):
+        """Queues the cubes in the pool and waits for the solutions. Returns None if the queue is full."""
+        with self.lock:
+            if self.pending + len(cubestrings) > self.max_queued:
+                return None
+            self.pending += len(cubestrings)
+        try:
+            results = [self.pool.solve_async(c, max_length, timeout) for c in cubestrings]
+            return [r.get() for r in results]
+        finally:
+            with self.lock:
+                self.pending -= len(cubestrings)
+                self.solved += len(cubestrings)
+
+    def status(self):
+        with self.lock:
+            return {'workers': self.workers,
+                    'queued': max(0, self.pending - self.workers),
+                    'running': min(self.pending, self.workers),
+                    'solved': self.solved}
+
+    def serve_forever(self):
+        print('solver daemon listening on %s:%d with %d workers' % (*self.server.server_address, self.workers))
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.pool.terminate()
+
+    def shutdown(self):
+        """Stops serve_forever, called from another thread."""
+        self.server.shutdown()
+
+
+class SolverClient:
+    """Sends solve requests to a running SolverDaemon. The client does not import the solver, so it does not load any
+    tables."""
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.url = 'http://%s:%d' % (host, port)
+
+    def _request(self, path, data=None, timeout=None):
+        if data is not None:
+            data = json.dumps(data).encode()
+        req = urllib.request.Request(self.url + path, data, {'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(json.loads(e.read()).get('error', str(e)))
+
+    def is_running(self):
+        """True if the daemon answers."""
+        try:
+            self._request('/status', timeout=1)
+            return True
+        except (OSError, ValueError, RuntimeError):
+            return False
+
+    def status(self):
+        return self._request('/status')
+
+    def solve(self, cubestring, max_length=50, timeout=10):
+        """The same as solver.solve, but the cube is solved by the daemon."""
+        return self._request('/solve', {'cube': cubestring, 'max_length': max_length, 'timeout': timeout})['solution']
+
+    def solve_many(self, cubestrings, max_length=50, timeout=10):
+        """Solves a batch of cubes in parallel and returns the list of solutions in the order of cubestrings."""
+        return self._request('/solve', {'cubes': list(cubestrings), 'max_length': max_length,
+                                        'timeout': timeout})['solutions']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Solver daemon for the two-phase solver.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on (default %s)' % DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port (default %d)' % DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--max-queued', type=int, default=1000, help='maximal number of queued cubes (default 1000)')
+    args = parser.parse_args()
+    SolverDaemon(args.host, args.port, args.workers, args.max_queued).serve_forever()
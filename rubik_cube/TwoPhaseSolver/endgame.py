@@ -0,0 +1,76 @@
+# ########## Lookup table with optimal solutions for all positions within a few moves of the solved cube. ##############
+
+import time
+import threading as thr
+
+import moves as mv
+import enums as en
+from defs import N_MOVE, N_TWIST, N_FLIP, N_CORNERS, N_SLICE_SORTED
+
+DEPTH = 5  # default depth, 621649 positions. Depth 6 has 8,240,087 positions and needs about 1 GB.
+
+table = {}  # packed coordinates -> next move towards the solved cube
+table_depth = -1  # all positions with distance <= table_depth are in the table
+_lock = thr.Lock()
+
+
+def pack(twist, flip, corners, slice_sorted, u_edges, d_edges):
+    """Packs the six coordinates which determine a cube uniquely into one integer."""
+    return twist + N_TWIST * (flip + N_FLIP * (corners + N_CORNERS * (slice_sorted + N_SLICE_SORTED *
+                                                                          (u_edges + N_SLICE_SORTED * d_edges))))
+
+
+def create_table(depth=DEPTH):
+    """Creates the table with a breadth first search from the solved cube. The table is built only once for each
+    depth, it is kept in memory and not saved to disk because building it takes only a few seconds."""
+    global table, table_depth
+    with _lock:
+        if depth <= table_depth:
+            return
+        print('creating endgame table up to depth ' + str(depth) + '...')
+        start = time.monotonic()
+        tw, fl, co, sl = mv.twist_move, mv.flip_move, mv.corners_move, mv.slice_sorted_move
+        ue, de = mv.u_edges_move, mv.d_edges_move
+        # the solved cube, for the u_edges and d_edges coordinates the solved state is not 0
+        start_state = (0, 0, 0, 0, 1656, 0)
+        table = {pack(*start_state): -1}
+        frontier = [start_state]
+        for d in range(depth):
+            next_frontier = []
+            for (twist, flip, corners, slice_sorted, u_edges, d_edges) in frontier:
+                for m in range(N_MOVE):
+                    twist1 = tw[N_MOVE * twist + m]
+                    flip1 = fl[N_MOVE * flip + m]
+                    corners1 = co[N_MOVE * corners + m]
+                    slice1 = sl[N_MOVE * slice_sorted + m]
+                    u_edges1 = ue[N_MOVE * u_edges + m]
+                    d_edges1 = de[N_MOVE * d_edges + m]
+                    idx = pack(twist1, flip1, corners1, slice1, u_edges1, d_edges1)
+                    if idx not in table:
+                        table[idx] = (m // 3) * 3 + (2 - m % 3)  # the inverse move leads back to the solved cube
+                        next_frontier.append((twist1, flip1, corners1, slice1, u_edges1, d_edges1))
+            frontier = next_frontier
+            print('depth:', d + 1, 'done: ' + str(len(table)) + ' positions')
+        table_depth = depth
+        print('endgame table created in ' + str(round(time.monotonic() - start, 1)) + ' s')
+
+
+def lookup(cc):
+    """Returns an optimal maneuver which solves the cubie cube cc if the cube is in the table, otherwise None.
+     The table must have been created with create_table before."""
+    twist, flip, corners = cc.get_twist(), cc.get_flip(), cc.get_corners()
+    slice_sorted, u_edges, d_edges = cc.get_slice_sorted(), cc.get_u_edges(), cc.get_d_edges()
+    m = table.get(pack(twist, flip, corners, slice_sorted, u_edges, d_edges))
+    if m is None:
+        return None
+    man = []
+    while m >= 0:  # follow the moves back to the solved cube
+        man.append(en.Move(m))
+        twist = mv.twist_move[N_MOVE * twist + m]
+        flip = mv.flip_move[N_MOVE * flip + m]
+        corners = mv.corners_move[N_MOVE * corners + m]
+        slice_sorted = mv.slice_sorted_move[N_MOVE * slice_sorted + m]
+        u_edges = mv.u_edges_move[N_MOVE * u_edges + m]
+        d_edges = mv.d_edges_move[N_MOVE * d_edges + m]
+        m = table[pack(twist, flip, corners, slice_sorted, u_edges, d_edges)]
+    return man
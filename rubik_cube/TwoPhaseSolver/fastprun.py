@@ -0,0 +1,259 @@
+# ######### Vectorized and multi-process generation of the pruning tables with NumPy ##################################
+# The breadth first search works on an array with the exact distance of each entry. Each depth is done with NumPy bulk
+# operations on chunks of the table which are distributed to a process pool. The result is packed into the same
+# format as in pruning.create_phase1_prun_table and pruning.create_phase2_prun_table, so the files are byte-identical.
+# The phase 2 table can also be filled completely, and both tables can also be packed with the exact distances, which
+# takes too long without NumPy.
+
+import time
+import array as ar
+import multiprocessing as mp
+import numpy as np
+
+import cubie as cb
+import moves as mv
+import symmetries as sy
+import enums
+from defs import N_TWIST, N_FLIP, N_FLIPSLICE_CLASS, N_MOVE, N_SYM_D4h, N_CORNERS_CLASS, N_UD_EDGES
+
+CHUNK = 1 << 22  # number of table entries of one task
+PHASE2_MOVES = (enums.Move.U1, enums.Move.U2, enums.Move.U3, enums.Move.R2, enums.Move.F2, enums.Move.D1, enums.Move.D2,
+                enums.Move.D3, enums.Move.L2, enums.Move.B2)
+
+try:
+    mp_context = mp.get_context('fork')  # the workers inherit the tables and the shared distance array
+except ValueError:
+    mp_context = None  # no fork on Windows, the chunks are done in this process
+
+# set in _create before the pool is created
+_phase = None  # neighbors function, moves, number of entries per class, conjugation table, symmetries of the classes
+_tables = None  # the tables of the neighbors function as NumPy arrays
+_dist = None  # the shared distance array, -1 for entries not yet filled
+
+
+def _view(a):
+    """The array.array a as int64 NumPy array, for the index arithmetic."""
+    return np.frombuffer(a, dtype='u' + str(a.itemsize)).astype(np.int64)
+
+
+def flipslice_symmetries():
+    """Returns an array with a bitmask for each flipslice class. Bit s is set if the symmetry s maps the representant
+    of the class to itself, the same as fs_sym in pruning.create_phase1_prun_table."""
+    ep = np.empty((N_FLIPSLICE_CLASS, 12), dtype=np.int64)
+    eo = np.empty((N_FLIPSLICE_CLASS, 12), dtype=np.int64)
+    cc = cb.CubieCube()
+    for i in range(N_FLIPSLICE_CLASS):
+        rep = sy.flipslice_rep[i]
+        cc.set_slice(rep // N_FLIP)
+        cc.set_flip(rep % N_FLIP)
+        ep[i] = cc.ep
+        eo[i] = cc.eo
+    in_slice = ep >= 8  # the positions of the edges FR, FL, BL and BR determine the slice coordinate
+    fs_sym = np.zeros(N_FLIPSLICE_CLASS, dtype=np.int64)
+    for s in range(N_SYM_D4h):
+        s_ep, s_eo = np.array(sy.symCube[s].ep), np.array(sy.symCube[s].eo)
+        inv = sy.symCube[sy.inv_idx[s]]
+        inv_ep, inv_eo = np.array(inv.ep), np.array(inv.eo)
+        ep1 = s_ep[ep]  # s*cc, see CubieCube.edge_multiply
+        eo1 = (eo + s_eo[ep]) % 2
+        ep2 = ep1[:, inv_ep]  # s*cc*s^-1
+        eo2 = (inv_eo + eo1[:, inv_ep]) % 2
+        same = np.all(eo2 == eo, axis=1) & np.all((ep2 >= 8) == in_slice, axis=1)
+        fs_sym |= same.astype(np.int64) << s
+    return fs_sym
+
+
+def corner_symmetries():
+    """Returns an array with a bitmask for each corner class. Bit s is set if the symmetry s maps the representant of
+    the class to itself, the same as c_sym in pruning.create_phase2_prun_table."""
+    cp = np.empty((N_CORNERS_CLASS, 8), dtype=np.int64)
+    cc = cb.CubieCube()
+    for i in range(N_CORNERS_CLASS):
+        cc.set_corners(sy.corner_rep[i])
+        cp[i] = cc.cp
+    c_sym = np.zeros(N_CORNERS_CLASS, dtype=np.int64)
+    for s in range(N_SYM_D4h):
+        s_cp, inv_cp = np.array(sy.symCube[s].cp), np.array(sy.symCube[sy.inv_idx[s]].cp)
+        cp2 = s_cp[cp][:, inv_cp]  # s*cc*s^-1, see CubieCube.corner_multiply
+        c_sym |= np.all(cp2 == cp, axis=1).astype(np.int64) << s
+    return c_sym
+
+
+def _neighbors_phase1(ix, m):
+    """The table indices of the positions after move m for the table indices ix, and their classes and twists."""
+    twist_move, flip_move, slice_sorted_move, classidx, fs_sym, twist_conj, rep_flip, rep_slice = _tables
+    fs_class = ix // N_TWIST
+    twist1 = twist_move[N_MOVE * (ix % N_TWIST) + m]
+    flip1 = flip_move[N_MOVE * rep_flip[fs_class] + m]
+    slice1 = slice_sorted_move[432 * rep_slice[fs_class] + m] // 24  # 18*24 = 432
+    flipslice1 = (slice1 << 11) + flip1
+    fs1_class = classidx[flipslice1]
+    twist1 = twist_conj[(twist1 << 4) + fs_sym[flipslice1]]
+    return N_TWIST * fs1_class + twist1, fs1_class, twist1
+
+
+def _neighbors_phase2(ix, m):
+    """The table indices of the positions after move m for the table indices ix, and their classes and ud_edges."""
+    corners_move, ud_edges_move, corner_classidx, corner_sym, ud_edges_conj, corner_rep = _tables
+    c_class = ix // N_UD_EDGES
+    ud_edges1 = ud_edges_move[N_MOVE * (ix % N_UD_EDGES) + m]
+    corners1 = corners_move[N_MOVE * corner_rep[c_class] + m]
+    c1_class = corner_classidx[corners1]
+    ud_edges1 = ud_edges_conj[(ud_edges1 << 4) + corner_sym[corners1]]
+    return N_UD_EDGES * c1_class + ud_edges1, c1_class, ud_edges1
+
+
+# The workers write depth + 1 directly into the shared distance array. Several workers may write the same entry, but
+# always the same value, and depth + 1 does not change the result of any comparison with depth or with -1 made by the
+# other workers in the same pass.
+
+def _forward(lo, hi, depth):
+    """Sets the not yet filled entries which are reached from the entries with distance depth in lo <= index < hi to
+    depth + 1, including the symmetric representations."""
+    neighbors, moves, n_coord, conj, sym = _phase
+    ix = np.flatnonzero(_dist[lo:hi] == depth) + lo
+    for m in moves:
+        ix1, class1, coord1 = neighbors(ix, m)
+        unfilled = _dist[ix1] < 0
+        ix1, class1, coord1 = ix1[unfilled], class1[unfilled], coord1[unfilled]
+        _dist[ix1] = depth + 1
+        # a symmetric position has eventually more than one representation, all of them are not yet filled
+        class1_sym = sym[class1]
+        for j in range(1, N_SYM_D4h):
+            sel = (class1_sym >> j) & 1 == 1
+            _dist[n_coord * class1[sel] + conj[(coord1[sel] << 4) + j]] = depth + 1
+
+
+def _backward(lo, hi, depth):
+    """Sets the not yet filled entries in lo <= index < hi which have a neighbor with distance depth to depth + 1."""
+    neighbors, moves = _phase[:2]
+    ix = np.flatnonzero(_dist[lo:hi] < 0) + lo
+    found = np.zeros(len(ix), dtype=bool)
+    for m in moves:
+        ix1 = neighbors(ix[~found], m)[0]
+        found[~found] = _dist[ix1] == depth
+    _dist[ix[found]] = depth + 1
+
+
+def _task(args):
+    direction, lo, hi, depth = args
+    if direction == 'forward':
+        _forward(lo, hi, depth)
+    else:
+        _backward(lo, hi, depth)
+
+
+def _create(total, max_depth, processes):
+    """Fills the distance array of the table with total entries up to max_depth, None for all entries. The entries
+    with a greater distance stay -1."""
+    global _dist
+    shared = mp.RawArray('b', total)  # shared with the worker processes without copying
+    _dist = np.frombuffer(shared, dtype=np.int8)
+    _dist[:] = -1
+    _dist[0] = 0  # solved cube, class 0 and coordinate 0
+
+    pool = None
+    if mp_context is not None and processes != 1:
+        pool = mp_context.Pool(processes)
+    chunks = [(lo, min(lo + CHUNK, total)) for lo in range(0, total, CHUNK)]
+    done = 1
+    depth = 0
+    print('depth:', depth, 'done: ' + str(done) + '/' + str(total))
+    try:
+        while done != total and (max_depth is None or depth < max_depth):
+            # the search from the entries with distance depth is faster as long as there are much less of them than
+            # unfilled entries, which stop at the first neighbor with distance depth. Both give the same table.
+            frontier = int(np.count_nonzero(_dist == depth))
+            if frontier == 0:
+                break
+            direction = 'forward' if 2 * frontier < total - done else 'backward'
+            tasks = [(direction, lo, hi, depth) for lo, hi in chunks]
+            results = pool.imap_unordered(_task, tasks) if pool is not None else map(_task, tasks)
+            depth_start = time.monotonic()
+            for k, _ in enumerate(results):
+                elapsed = time.monotonic() - depth_start
+                eta = elapsed / (k + 1) * (len(chunks) - k - 1)
+                print('\rdepth %d (%s): %d/%d chunks, %.0f s, ETA %.0f s   ' %
+                      (depth + 1, direction, k + 1, len(chunks), elapsed, eta), end='', flush=True)
+            done += int(np.count_nonzero(_dist == depth + 1))
+            depth += 1
+            print()
+            print('depth:', depth, 'done: ' + str(done) + '/' + str(total))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    return _dist
+
+
+def _pack(dist, n):
+    """Packs 16 entries of 2 bits, the distances mod 3, into each of the n words of an array('L'). Unfilled entries
+    and unused entries at the end are 3."""
+    depth3 = np.full(16 * n, 3, dtype=np.uint8)
+    depth3[:len(dist)] = np.where(dist < 0, 3, dist % 3)
+    words = np.zeros(n, dtype=np.uint64)
+    for i in range(16):
+        words |= depth3[i::16].astype(np.uint64) << np.uint64(2 * i)
+    table = ar.array('L')
+    table.frombytes(words.astype('u' + str(table.itemsize)).tobytes())
+    return table
+
+
+def _pack_exact(dist, packing, unfilled):
+    """Returns the distances as array('B') with one entry per byte or, with packing 'nibble', two entries per byte,
+    the first one in the low 4 bits. Unfilled entries are unfilled, which must be greater than all distances and fit
+    into the packing."""
+    if dist.max() >= unfilled or unfilled >= (16 if packing == 'nibble' else 256):
+        raise ValueError('the distances do not fit into the ' + packing + ' table')
+    depth = np.where(dist < 0, unfilled, dist).astype(np.uint8)
+    if packing == 'nibble':
+        if len(depth) % 2:
+            depth = np.append(depth, np.uint8(unfilled))
+        depth = depth[0::2] | (depth[1::2] << 4)
+    table = ar.array('B')
+    table.frombytes(depth.tobytes())
+    return table
+
+
+def create_phase1_prun_table(processes=None, packing='depth3'):
+    """Creates the flipslice_twist_depth3 table of pruning.py and returns it as array('L').
+    :param processes: The number of worker processes, default is the number of CPUs.
+    :param packing: 'depth3': the distances mod 3 as array('L'). 'nibble' or 'byte': the flipslice_twist_depth table
+     with the exact distances as array('B'), see pruning.EXACT.
+    """
+    global _phase, _tables, _dist
+    start = time.monotonic()
+    total = N_FLIPSLICE_CLASS * N_TWIST
+    flipslice_rep = _view(sy.flipslice_rep)
+    twist_conj = _view(sy.twist_conj)
+    _tables = (_view(mv.twist_move), _view(mv.flip_move), _view(mv.slice_sorted_move), _view(sy.flipslice_classidx),
+               _view(sy.flipslice_sym), twist_conj, flipslice_rep % N_FLIP, flipslice_rep // N_FLIP)
+    _phase = (_neighbors_phase1, range(N_MOVE), N_TWIST, twist_conj, flipslice_symmetries())
+    dist = _create(total, None, processes)
+    # all entries are filled, unfilled does not matter
+    table = _pack(dist, total // 16 + 1) if packing == 'depth3' else _pack_exact(dist, packing, 15)
+    _phase = _tables = _dist = None
+    print('phase1_prun table created in ' + str(round(time.monotonic() - start)) + ' s')
+    return table
+
+
+def create_phase2_prun_table(max_depth=10, processes=None, packing='depth3', unfilled=15):
+    """Creates the corners_ud_edges_depth3 table of pruning.py and returns it as array('L').
+    :param max_depth: The entries are filled up to this distance, the others are 3. None fills the complete table.
+    :param processes: The number of worker processes, default is the number of CPUs.
+    :param packing: 'depth3': the distances mod 3 as array('L'). 'nibble' or 'byte': the corners_ud_edges_depth table
+     with the exact distances as array('B'), see pruning.EXACT.
+    :param unfilled: The value of the entries which are not filled in the exact table.
+    """
+    global _phase, _tables, _dist
+    start = time.monotonic()
+    total = N_CORNERS_CLASS * N_UD_EDGES
+    ud_edges_conj = _view(sy.ud_edges_conj)
+    _tables = (_view(mv.corners_move), _view(mv.ud_edges_move), _view(sy.corner_classidx), _view(sy.corner_sym),
+               ud_edges_conj, _view(sy.corner_rep))
+    _phase = (_neighbors_phase2, PHASE2_MOVES, N_UD_EDGES, ud_edges_conj, corner_symmetries())
+    dist = _create(total, max_depth, processes)
+    table = _pack(dist, total // 16) if packing == 'depth3' else _pack_exact(dist, packing, unfilled)
+    _phase = _tables = _dist = None
+    print('phase2_prun table created in ' + str(round(time.monotonic() - start)) + ' s')
+    return table
@@ -0,0 +1,104 @@
+# ######## Vectorized evaluation of all phase 1 children of a node with NumPy fancy indexing over the tables ###########
+
+import time
+import random
+import numpy as np
+
+import face
+import cubie
+import coord
+import moves as mv
+import symmetries as sy
+import pruning as pr
+from defs import N_MOVE
+
+
+def _view(a):
+    """A NumPy view of an array.array without copying the data."""
+    return np.frombuffer(a, dtype='u' + str(a.itemsize))
+
+
+flip_move = _view(mv.flip_move).reshape(-1, N_MOVE)
+twist_move = _view(mv.twist_move).reshape(-1, N_MOVE)
+slice_sorted_move = _view(mv.slice_sorted_move).reshape(-1, N_MOVE)
+flipslice_classidx = _view(sy.flipslice_classidx).astype(np.int64)
+flipslice_sym = _view(sy.flipslice_sym).astype(np.int64)
+twist_conj = _view(sy.twist_conj).astype(np.int64)
+if pr.EXACT:
+    flipslice_twist_depth = _view(pr.flipslice_twist_depth)
+else:
+    flipslice_twist_depth3 = _view(pr.flipslice_twist_depth3)
+distance = np.frombuffer(pr.distance, dtype=np.int8).astype(np.int64)
+
+# the successor move tables as index arrays
+next_moves_phase1 = [np.array(m, dtype=np.int64) for m in mv.next_moves_phase1]
+next_moves_phase1_end = [np.array(m, dtype=np.int64) for m in mv.next_moves_phase1_end]
+
+
+def phase1_children(flip, twist, slice_sorted, dist, togo_phase1, moves):
+    """Computes all children of a phase 1 node at once.
+    :param moves: The index array of the moves to apply, e.g. next_moves_phase1[last]
+    :return: A list of (dist, move, flip, twist, slice_sorted) tuples of the children with dist < togo_phase1, in the
+     order of moves, like solver.phase1_children.
+    """
+    flip_new = flip_move[flip, moves]
+    twist_new = twist_move[twist, moves].astype(np.int64)
+    slice_sorted_new = slice_sorted_move[slice_sorted, moves]
+    flipslice = 2048 * (slice_sorted_new // 24).astype(np.int64) + flip_new  # N_FLIP * (slice_sorted // 24) + flip
+    ix = 2187 * flipslice_classidx[flipslice] + twist_conj[(twist_new << 4) + flipslice_sym[flipslice]]
+    if pr.EXACT == 'byte':
+        dist_new = flipslice_twist_depth[ix]
+    elif pr.EXACT == 'nibble':
+        dist_new = (flipslice_twist_depth[ix >> 1] >> ((ix & 1) << 2)) & 15
+    else:
+        dist_new_mod3 = (flipslice_twist_depth3[ix >> 4] >> ((ix & 15) << 1).astype(np.uint64)) & 3
+        dist_new = distance[3 * dist + dist_new_mod3.astype(np.int64)]
+    keep = dist_new < togo_phase1
+    return list(zip(dist_new[keep].tolist(), moves[keep].tolist(), flip_new[keep].tolist(), twist_new[keep].tolist(),
+                    slice_sorted_new[keep].tolist()))
+
+
+def _search(children, tables, flip, twist, slice_sorted, dist, togo_phase1, last):
+    """Traverses the phase 1 search tree like SolverThread.search and returns the number of evaluated nodes."""
+    if togo_phase1 == 0:
+        return 1
+    next_moves, next_moves_end = tables
+    moves = next_moves_end[last] if dist == 0 and togo_phase1 < 5 else next_moves[last]
+    n = 1
+    for dist_new, m, flip_new, twist_new, slice_sorted_new in children(flip, twist, slice_sorted, dist, togo_phase1,
+                                                                       moves):
+        n += _search(children, tables, flip_new, twist_new, slice_sorted_new, dist_new, togo_phase1 - 1, m)
+    return n
+
+
+def benchmark(cubes=5, extra=(0, 1, 2), seed=0):
+    """Compares the scalar evaluation of solver.phase1_children and the vectorized evaluation by traversing complete
+    phase 1 search trees of random cubes.
+    :param cubes: The number of random cubes
+    :param extra: The search depths relative to the phase 1 distance of the cube
+    :param seed: The seed of the random cubes
+    """
+    import solver  # not at the top, solver imports this module
+    random.seed(seed)
+    start_nodes = []
+    for i in range(cubes):
+        cc = cubie.CubieCube()
+        cc.randomize()
+        co = coord.CoordCube(cc)
+        start_nodes.append((co.flip, co.twist, co.slice_sorted, co.get_depth_phase1()))
+    print('depth      nodes   scalar [us/node]   numpy [us/node]')
+    for e in extra:
+        result = []
+        for children, tables in ((solver.phase1_children, (mv.next_moves_phase1, mv.next_moves_phase1_end)),
+                                 (phase1_children, (next_moves_phase1, next_moves_phase1_end))):
+            nodes = 0
+            start = time.perf_counter()
+            for flip, twist, slice_sorted, dist in start_nodes:
+                nodes += _search(children, tables, flip, twist, slice_sorted, dist, dist + e, N_MOVE)
+            result += [nodes, (time.perf_counter() - start) / nodes * 1e6]
+        assert result[0] == result[2]  # both paths traverse the same tree
+        print('d+%d %12d %18.2f %17.2f' % (e, result[0], result[1], result[3]))
+
+
+if __name__ == '__main__':
+    benchmark()
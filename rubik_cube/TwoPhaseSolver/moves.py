@@ -1,8 +1,8 @@
 # ################### Movetables describe the transformation of the coordinates by cube moves. #########################
 
-from os import path
 import array as ar
 import cubie as cb
+import tables as tb
 import enums
 from defs import N_TWIST, N_FLIP, N_SLICE_SORTED, N_CORNERS, N_UD_EDGES, N_MOVE
 
@@ -11,7 +11,8 @@ a = cb.CubieCube()
 
 # The twist coordinate describes the 3^7 = 2187 possible orientations of the 8 corners
 fname = "move_twist"
-if not path.isfile(fname):
+twist_move = tb.load(fname, 'H', N_TWIST * N_MOVE)
+if twist_move is None:
     print("creating " + fname + " table...")
     twist_move = ar.array('H', [0 for i in range(N_TWIST * N_MOVE)])
     for i in range(N_TWIST):
@@ -21,21 +22,15 @@ if not path.isfile(fname):
                 a.corner_multiply(cb.basicMoveCube[j])
                 twist_move[N_MOVE * i + 3 * j + k] = a.get_twist()
             a.corner_multiply(cb.basicMoveCube[j])  # 4. move restores face
-    fh = open(fname, "wb")
-    twist_move.tofile(fh)
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    twist_move = ar.array('H')
-    twist_move.fromfile(fh, N_TWIST * N_MOVE)
-fh.close()
+    tb.save(fname, twist_move)
 ########################################################################################################################
 
 # ################  Move table for the flip of the edges. flip < 2048 in phase 1, flip = 0 in phase 2.##################
 
 # The flip coordinate describes the 2^11 = 2048 possible orientations of the 12 edges
 fname = "move_flip"
-if not path.isfile(fname):
+flip_move = tb.load(fname, 'H', N_FLIP * N_MOVE)
+if flip_move is None:
     print("creating " + fname + " table...")
     flip_move = ar.array('H', [0 for i in range(N_FLIP * N_MOVE)])
     for i in range(N_FLIP):
@@ -45,14 +40,7 @@ if not path.isfile(fname):
                 a.edge_multiply(cb.basicMoveCube[j])
                 flip_move[N_MOVE * i + 3 * j + k] = a.get_flip()
             a.edge_multiply(cb.basicMoveCube[j])
-    fh = open(fname, "wb")
-    flip_move.tofile(fh)
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    flip_move = ar.array('H')
-    flip_move.fromfile(fh, N_FLIP * N_MOVE)
-fh.close()
+    tb.save(fname, flip_move)
 ########################################################################################################################
 
 # ###################### Move table for the four UD-slice edges FR, FL, Bl and BR. #####################################
@@ -62,7 +50,8 @@ fh.close()
 # slice_sorted coordinate gives us the permutation of the FR, FL, BL and BR edges at the beginning of phase 2 for free.
 # slice_sorted  < 11880 in phase 1, slice  < 24 in phase 2, slice = 0 for solved cube
 fname = "move_slice_sorted"
-if not path.isfile(fname):
+slice_sorted_move = tb.load(fname, 'H', N_SLICE_SORTED * N_MOVE)
+if slice_sorted_move is None:
     print("creating " + fname + " table...")
     slice_sorted_move = ar.array('H', [0 for i in range(N_SLICE_SORTED * N_MOVE)])
     for i in range(N_SLICE_SORTED):
@@ -74,15 +63,8 @@ if not path.isfile(fname):
                 a.edge_multiply(cb.basicMoveCube[j])
                 slice_sorted_move[N_MOVE * i + 3 * j + k] = a.get_slice_sorted()
             a.edge_multiply(cb.basicMoveCube[j])
-    fh = open(fname, "wb")
-    slice_sorted_move.tofile(fh)
+    tb.save(fname, slice_sorted_move)
     print()
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    slice_sorted_move = ar.array('H')
-    slice_sorted_move.fromfile(fh, N_SLICE_SORTED * N_MOVE)
-fh.close()
 ########################################################################################################################
 
 # ################# Move table for the u_edges coordinate for transition phase 1 -> phase 2 ############################
@@ -91,7 +73,8 @@ fh.close()
 # the end of phase 1 to set up the coordinates of phase 2
 # slice_sorted  < 11880 in phase 1, slice  < 24 in phase 2, slice = 0 for solved cube
 fname = "move_u_edges"
-if not path.isfile(fname):
+u_edges_move = tb.load(fname, 'H', N_SLICE_SORTED * N_MOVE)
+if u_edges_move is None:
     print("creating " + fname + " table...")
     u_edges_move = ar.array('H', [0 for i in range(N_SLICE_SORTED * N_MOVE)])
     for i in range(N_SLICE_SORTED):
@@ -103,15 +86,8 @@ if not path.isfile(fname):
                 a.edge_multiply(cb.basicMoveCube[j])
                 u_edges_move[N_MOVE * i + 3 * j + k] = a.get_u_edges()
             a.edge_multiply(cb.basicMoveCube[j])
-    fh = open(fname, "wb")
-    u_edges_move.tofile(fh)
+    tb.save(fname, u_edges_move)
     print()
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    u_edges_move = ar.array('H')
-    u_edges_move.fromfile(fh, N_SLICE_SORTED * N_MOVE)
-fh.close()
 ########################################################################################################################
 
 # ################# Move table for the d_edges coordinate for transition phase 1 -> phase 2 ############################
@@ -120,7 +96,8 @@ fh.close()
 # the end of phase 1 to set up the coordinates of phase 2
 # slice_sorted  < 11880 in phase 1, slice  < 24 in phase 2, slice = 0 for solved cube
 fname = "move_d_edges"
-if not path.isfile(fname):
+d_edges_move = tb.load(fname, 'H', N_SLICE_SORTED * N_MOVE)
+if d_edges_move is None:
     print("creating " + fname + " table...")
     d_edges_move = ar.array('H', [0 for i in range(N_SLICE_SORTED * N_MOVE)])
     for i in range(N_SLICE_SORTED):
@@ -132,22 +109,16 @@ if not path.isfile(fname):
                 a.edge_multiply(cb.basicMoveCube[j])
                 d_edges_move[N_MOVE * i + 3 * j + k] = a.get_d_edges()
             a.edge_multiply(cb.basicMoveCube[j])
-    fh = open(fname, "wb")
-    d_edges_move.tofile(fh)
+    tb.save(fname, d_edges_move)
     print()
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    d_edges_move = ar.array('H')
-    d_edges_move.fromfile(fh, N_SLICE_SORTED * N_MOVE)
-fh.close()
 ########################################################################################################################
 
 # ######################### # Move table for the edges in the U-face and D-face. URtoDB  < 40320 #######################
 
 # The ud_edges coordinate describes the 40320 permutations of the edges UR, UF, UL, UB, DR, DF, DL and DB in phase 2
 fname = "move_ud_edges"
-if not path.isfile(fname):
+ud_edges_move = tb.load(fname, 'H', N_UD_EDGES * N_MOVE)
+if ud_edges_move is None:
     print("creating " + fname + " table...")
     ud_edges_move = ar.array('H', [0 for i in range(N_UD_EDGES * N_MOVE)])
     for i in range(N_UD_EDGES):
@@ -164,22 +135,16 @@ if not path.isfile(fname):
                     continue
                 ud_edges_move[N_MOVE * i + 3 * j + k] = a.get_ud_edges()
             a.edge_multiply(cb.basicMoveCube[j])
-    fh = open(fname, "wb")
-    ud_edges_move.tofile(fh)
+    tb.save(fname, ud_edges_move)
     print()
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    ud_edges_move = ar.array('H')
-    ud_edges_move.fromfile(fh, N_UD_EDGES * N_MOVE)
-fh.close()
 ########################################################################################################################
 
 # ############################ Move table for the  corners coordinate in phase 2 #######################################
 
 # The corners coordinate describes the 8! = 40320 permutations of the corners.
 fname = "move_corners"
-if not path.isfile(fname):
+corners_move = tb.load(fname, 'H', N_CORNERS * N_MOVE)
+if corners_move is None:
     print("creating " + fname + " table...")
     corners_move = ar.array('H', [0 for i in range(N_CORNERS * N_MOVE)])
     # Move table for the corners. corner  < 40320
@@ -194,14 +159,31 @@ if not path.isfile(fname):
                 a.corner_multiply(cb.basicMoveCube[j])
                 corners_move[N_MOVE * i + 3 * j + k] = a.get_corners()
             a.corner_multiply(cb.basicMoveCube[j])
-    fh = open(fname, "wb")
-    corners_move.tofile(fh)
-    fh.close()
+    tb.save(fname, corners_move)
     print()
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    corners_move = ar.array('H')
-    corners_move.fromfile(fh, N_CORNERS * N_MOVE)
-fh.close()
+########################################################################################################################
+
+# ############################ Tables of the allowed successor moves in the search ####################################
+
+# next_moves_phase1[m] is the ordered tuple of the moves which may follow move m in phase 1, next_moves_phase1[N_MOVE]
+# holds the moves if there is no previous move. Successive moves on the same face and successive moves on the same axis
+# in the wrong order are never generated. next_moves_phase1_end is used if phase 1 is already solved and there are less
+# than 5 moves left (no phase 2 moves), next_moves_phase2 is used in phase 2 (only phase 2 moves).
+phase2_moves = (enums.Move.U1, enums.Move.U2, enums.Move.U3, enums.Move.R2, enums.Move.F2, enums.Move.D1,
+                enums.Move.D2, enums.Move.D3, enums.Move.L2, enums.Move.B2)
+
+
+def successor_table(moves):
+    table = []
+    for prev in range(N_MOVE + 1):
+        if prev == N_MOVE:  # no previous move
+            table.append(tuple(int(m) for m in moves))
+        else:
+            table.append(tuple(int(m) for m in moves if prev // 3 - m // 3 not in (0, 3)))
+    return tuple(table)
+
+
+next_moves_phase1 = successor_table(list(enums.Move))
+next_moves_phase1_end = successor_table([m for m in enums.Move if m not in phase2_moves])
+next_moves_phase2 = successor_table(phase2_moves)
 ########################################################################################################################
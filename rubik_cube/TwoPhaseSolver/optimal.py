@@ -0,0 +1,295 @@
+# ################### Optimal solver: IDA* search for a maneuver of minimal length #####################################
+# The two-phase algorithm in solver.py returns as soon as some maneuver with length <= max_length has been found. The
+# IDA* search here proves that no shorter maneuver exists. The lower bound for the number of moves to solve a cube is
+# the maximum of
+# - the distance to the subgroup H from the flipslice_twist_depth3 table of phase 1, applied to the cube and to the two
+#   cubes conjugated by the 120° rotations along the long diagonal. So H is used for the UD, RL and FB axis.
+# - the exact distance of the corners (permutation and twist) from the symmetry reduced corner_depth table below.
+# These bounds are weak for long maneuvers. The search tree grows by a factor of about 13 per move. A cube with an
+# optimal solution of 15 moves needs about 1.8 million nodes and 100 seconds per core, 16 moves about 20 minutes per
+# core and 17 or 18 moves, like most random cubes, hours. Faster optimal solvers use a pruning table of the phase 1
+# coordinates combined with the corners, which has billions of entries.
+
+import threading as thr
+import time
+import array as ar
+
+import numpy as np
+
+import defs
+import face
+import cubie
+import enums as en
+import coord
+import moves as mv
+import symmetries as sy
+import pruning as pr
+import tables as tb
+from solver import mp_context, CHECK_INTERVAL
+
+corner_depth = None  # global variable, initialized during pruning table creation
+
+
+def create_cornprun_table():
+    """Creates/loads the corner_depth pruning table for the optimal solver. The index is
+    N_TWIST * corner_classidx + twist conjugated by corner_sym, the value is the exact number of moves which are
+    necessary to solve the corners."""
+    global corner_depth
+    total = defs.N_CORNERS_CLASS * defs.N_TWIST
+    fname = "optimal_cornprun"
+    corner_depth = tb.load(fname, 'b', total)
+    if corner_depth is None:
+        print("creating " + fname + " table...")
+
+        # ##################### create table with the symmetries of the corners classes ################################
+        cc = cubie.CubieCube()
+        c_sym = np.zeros(defs.N_CORNERS_CLASS, dtype=np.int64)
+        for i in range(defs.N_CORNERS_CLASS):
+            rep = sy.corner_rep[i]
+            cc.set_corners(rep)
+            for s in range(defs.N_SYM_D4h):
+                ss = cubie.CubieCube(sy.symCube[s].cp, sy.symCube[s].co, sy.symCube[s].ep,
+                                     sy.symCube[s].eo)  # copy cube
+                ss.corner_multiply(cc)  # s*cc
+                ss.corner_multiply(sy.symCube[sy.inv_idx[s]])  # s*cc*s^-1
+                if ss.get_corners() == rep:
+                    c_sym[i] |= 1 << s
+        ################################################################################################################
+
+        # the tables as numpy arrays, so a complete BFS layer can be handled with a few array operations
+        corners_move = np.frombuffer(mv.corners_move, dtype=np.uint16).astype(np.int64)
+        twist_move = np.frombuffer(mv.twist_move, dtype=np.uint16).astype(np.int64)
+        corner_classidx = np.frombuffer(sy.corner_classidx, dtype=np.uint16).astype(np.int64)
+        corner_sym = np.frombuffer(sy.corner_sym, dtype=np.uint8).astype(np.int64)
+        corner_rep = np.frombuffer(sy.corner_rep, dtype=np.uint16).astype(np.int64)
+        twist_conj = np.frombuffer(sy.twist_conj, dtype=np.uint16).astype(np.int64)
+
+        table = np.full(total, -1, dtype=np.int8)
+        table[0] = 0  # solved corners
+        done = 1
+        depth = 0
+        print('depth:', depth, 'done: ' + str(done) + '/' + str(total))
+        while done != total:
+            frontier = np.flatnonzero(table == depth)
+            corners = corner_rep[frontier // defs.N_TWIST]
+            twist = frontier % defs.N_TWIST
+            for m in en.Move:
+                corners1 = corners_move[defs.N_MOVE * corners + m]
+                twist1 = twist_conj[(twist_move[defs.N_MOVE * twist + m] << 4) + corner_sym[corners1]]
+                classidx1 = corner_classidx[corners1]
+                idx1 = np.unique(defs.N_TWIST * classidx1 + twist1)
+                idx1 = idx1[table[idx1] == -1]  # entries not yet filled
+                table[idx1] = depth + 1
+                # ####symmetric position has eventually more than one representation ###############################
+                classidx1 = idx1 // defs.N_TWIST
+                twist1 = idx1 % defs.N_TWIST
+                for j in range(1, defs.N_SYM_D4h):
+                    has_sym = (c_sym[classidx1] >> j) & 1 == 1
+                    idx2 = defs.N_TWIST * classidx1[has_sym] + twist_conj[(twist1[has_sym] << 4) + j]
+                    idx2 = idx2[table[idx2] == -1]
+                    table[idx2] = depth + 1
+                ########################################################################################################
+            done = total - np.count_nonzero(table == -1)
+            depth += 1
+            print('depth:', depth, 'done: ' + str(done) + '/' + str(total))
+
+        corner_depth = ar.array('b', table.tobytes())
+        tb.save(fname, corner_depth)
+
+
+create_cornprun_table()
+
+
+class OptimalSearch:
+    """IDA* search below a fixed path. The state is given by the coordinates of the cube (corners, twist, flip and
+    slice_sorted) and by the phase 1 coordinates of the two conjugated cubes."""
+
+    def __init__(self, co_cube, terminated):
+        """
+        :param co_cube: The CoordCube of the cube to be solved. Needed to check if a path really solves the cube.
+        :param terminated: An event which signals that a solution has been found elsewhere
+        """
+        self.co_cube = co_cube
+        self.terminated = terminated
+        # terminated mirrored in a plain attribute and refreshed every CHECK_INTERVAL nodes. With several workers
+        # terminated is a multiprocessing event, which is too slow to be checked in every node, see solver.SolverThread
+        self.stopped = False
+        self.next_check = CHECK_INTERVAL
+        self.sofar = []
+        self.nodes = 0
+        self.solution = None
+
+    def is_solved(self):
+        """Phase 1 and the corners are solved on all three axes, check the permutation of the edges."""
+        slice_sorted = self.co_cube.slice_sorted
+        u_edges = self.co_cube.u_edges
+        d_edges = self.co_cube.d_edges
+        for m in self.sofar:
+            slice_sorted = mv.slice_sorted_move[18 * slice_sorted + m]
+            u_edges = mv.u_edges_move[18 * u_edges + m]
+            d_edges = mv.d_edges_move[18 * d_edges + m]
+        return slice_sorted == 0 and u_edges == 1656 and d_edges == 0
+
+    def search(self, corners, twist, axes, togo):
+        """
+        :param corners: The corner permutation
+        :param twist: The twist of the corners
+        :param axes: A tuple with a (flip, twist, slice_sorted, dist) tuple for each of the three axes. dist is the
+         distance to the subgroup H of this axis.
+        :param togo: The number of moves left
+        :return: True if a solution has been found
+        """
+        if self.stopped:
+            return False
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.next_check = self.nodes + CHECK_INTERVAL
+            self.stopped = self.terminated.is_set()
+        if togo == 0:
+            if self.is_solved():
+                self.solution = list(self.sofar)
+                return True
+            return False
+
+        if self.sofar:
+            last = self.sofar[-1]
+        else:
+            last = defs.N_MOVE  # no previous move
+        for m in mv.next_moves_phase1[last]:  # all moves which may follow the last move
+            corners_new = mv.corners_move[18 * corners + m]
+            twist_new = mv.twist_move[18 * twist + m]
+            classidx = sy.corner_classidx[corners_new]
+            sym = sy.corner_sym[corners_new]
+            if corner_depth[2187 * classidx + sy.twist_conj[(twist_new << 4) + sym]] >= togo:
+                continue  # impossible to solve the corners in togo - 1 moves
+
+            axes_new = []
+            for r in range(3):
+                flip_r, twist_r, slice_sorted_r, dist_r = axes[r]
+                m_r = sy.conj_rot[r][m]
+                flip_r = mv.flip_move[18 * flip_r + m_r]
+                twist_r = mv.twist_move[18 * twist_r + m_r]
+                slice_sorted_r = mv.slice_sorted_move[18 * slice_sorted_r + m_r]
+                flipslice = 2048 * (slice_sorted_r // 24) + flip_r
+                classidx = sy.flipslice_classidx[flipslice]
+                sym = sy.flipslice_sym[flipslice]
+                dist_r = pr.distance[3 * dist_r + pr.get_flipslice_twist_depth3(
+                    2187 * classidx + sy.twist_conj[(twist_r << 4) + sym])]
+                if dist_r >= togo:  # impossible to reach subgroup H of this axis in togo - 1 moves
+                    break
+                axes_new.append((flip_r, twist_r, slice_sorted_r, dist_r))
+            else:
+                self.sofar.append(m)
+                if self.search(corners_new, twist_new, axes_new, togo - 1):
+                    return True
+                self.sofar.pop(-1)
+        return False
+########################################################################################################################
+
+
+def initial_state(cc):
+    """Returns the coordinates (corners, twist, axes) of the cubie cube cc, see OptimalSearch.search."""
+    axes = []
+    for r in range(3):
+        if r == 0:
+            cb = cubie.CubieCube(cc.cp, cc.co, cc.ep, cc.eo)
+        elif r == 1:  # conjugation by 120° rotation
+            cb = cubie.CubieCube(sy.symCube[32].cp, sy.symCube[32].co, sy.symCube[32].ep, sy.symCube[32].eo)
+            cb.multiply(cc)
+            cb.multiply(sy.symCube[16])
+        else:  # conjugation by 240° rotation
+            cb = cubie.CubieCube(sy.symCube[16].cp, sy.symCube[16].co, sy.symCube[16].ep, sy.symCube[16].eo)
+            cb.multiply(cc)
+            cb.multiply(sy.symCube[32])
+        co_cube = coord.CoordCube(cb)
+        axes.append((co_cube.flip, co_cube.twist, co_cube.slice_sorted, co_cube.get_depth_phase1()))
+    co_cube = coord.CoordCube(cc)
+    return co_cube.corners, co_cube.twist, axes
+
+
+def lower_bound(corners, twist, axes):
+    """The maximum of the lower bounds from the pruning tables."""
+    classidx = sy.corner_classidx[corners]
+    sym = sy.corner_sym[corners]
+    return max(corner_depth[2187 * classidx + sy.twist_conj[(twist << 4) + sym]], axes[0][3], axes[1][3], axes[2][3])
+
+
+terminated_event = None  # set in the worker processes by init_worker
+
+
+def init_worker(terminated):
+    global terminated_event
+    terminated_event = terminated
+
+
+def search_subtree(task):
+    """Searches all maneuvers of length togo which start with the first move m. Runs in a worker process.
+    :return: (solution, nodes). solution is None if there is no solution in this subtree."""
+    cc, m, togo = task
+    srch = OptimalSearch(coord.CoordCube(cc), terminated_event)
+    # apply the first move to the cube
+    cm = cubie.CubieCube(cc.cp, cc.co, cc.ep, cc.eo)
+    cm.multiply(cubie.moveCube[m])
+    corners, twist, axes = initial_state(cm)
+    srch.sofar = [m]
+    if lower_bound(corners, twist, axes) < togo and srch.search(corners, twist, axes, togo - 1):
+        terminated_event.set()
+    return srch.solution, srch.nodes
+
+
+def solve_optimal(cubestring, workers=1, info=None):
+    """Solves a cube optimally, the returned maneuver has the least possible number of moves in the face turn metric.
+     :param cubestring: The format of the string is given in the Facelet class defined in the file enums.py
+     :param workers: The number of processes which search the subtrees of the different first moves in parallel.
+      None means the number of CPUs, 1 searches in the calling process.
+     :param info: If a dict is given, the number of generated nodes is stored with key 'nodes' and the search time in
+      seconds with key 'time'.
+     The search time grows by a factor of about 13 per move of the solution. Cubes with optimal solutions of up to 15
+     moves are solved within minutes, 17 or 18 moves, like most random cubes, need hours, see the top of this module.
+    """
+    fc = face.FaceCube()
+    s = fc.from_string(cubestring)
+    if s != cubie.CUBE_OK:
+        return s  # Error in facelet cube
+    cc = fc.to_cubie_cube()
+    s = cc.verify()
+    if s != cubie.CUBE_OK:
+        return s  # Error in cubie cube
+
+    s_time = time.monotonic()
+    corners, twist, axes = initial_state(cc)
+    nodes = 0
+    solution = []
+    togo = lower_bound(corners, twist, axes)
+    if workers == 1:
+        srch = OptimalSearch(coord.CoordCube(cc), thr.Event())
+        while not srch.search(corners, twist, axes, togo):  # iterative deepening
+            togo += 1
+        nodes = srch.nodes
+        solution = srch.solution
+    elif togo > 0:
+        terminated = mp_context.Event()
+        pool = mp_context.Pool(workers, initializer=init_worker, initargs=(terminated,))
+        try:
+            while True:  # iterative deepening, the subtrees of the first moves are searched in parallel
+                tasks = [(cc, m, togo) for m in mv.next_moves_phase1[defs.N_MOVE]]
+                found = None
+                for sol, n in pool.imap_unordered(search_subtree, tasks):
+                    nodes += n
+                    if sol is not None and found is None:
+                        found = sol
+                if found is not None:
+                    solution = found
+                    break
+                togo += 1
+        finally:
+            pool.terminate()
+            pool.join()
+
+    if info is not None:
+        info['nodes'] = nodes
+        info['time'] = time.monotonic() - s_time
+    s = ''
+    for m in solution:
+        s += en.Move(m).name + ' '
+    return s + '(' + str(len(solution)) + 'f)'
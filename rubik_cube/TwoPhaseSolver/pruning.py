@@ -1,17 +1,51 @@
 # ##################### The pruning tables cut the search tree during the search. ######################################
 # ##################### The pruning values are stored modulo 3 which saves a lot of memory. ############################
 
+import os
 import defs
 import enums
 import moves as mv
 import symmetries as sy
 import cubie as cb
-from os import path
+import tables as tb
 import time
 import array as ar
 
+try:
+    import fastprun  # NumPy version of the pruning table generation, minutes instead of half an hour
+except ImportError:
+    fastprun = None
+
+# With the environment variable TWOPHASE_FULL_PHASE2=1 the phase 2 pruning table phase2_prun_full holds the distances
+# of all entries, up to 18 moves, instead of only up to 10 moves. The search then also uses phase 2 maneuvers with more
+# than 10 moves. The first solution is found much earlier, but the many long phase 2 searches make short solutions take
+# longer, see benchmark.py. Without NumPy the complete table takes hours to create.
+FULL_PHASE2 = os.environ.get('TWOPHASE_FULL_PHASE2', '') not in ('', '0')
+PHASE2_MAX_LENGTH = 18 if FULL_PHASE2 else 10  # longest phase 2 maneuver, the table is exact up to this length
+
+# With the environment variable TWOPHASE_EXACT_PRUNING=nibble (or 1) or =byte the phase 1 and phase 2 pruning tables
+# store the exact distances instead of the distances mod 3, in 4 bits or in one byte per entry. The search reads the
+# distance of a child directly instead of computing it from the distance of the parent, and the initial distances need
+# no walk down to the solved position. The nibble tables need as much memory as the mod 3 tables with 8 byte 'L'
+# entries (Linux, macOS), twice as much with 4 byte 'L' entries (Windows), the byte tables twice as much again. The
+# exact tables are only created with NumPy, see fastprun.py. Entries of the phase 2 table which are not filled are
+# UNFILLED. The code which needs the distances mod 3, like the conjugated cubes in solver.py and optimal.py, uses the
+# exact tables through get_flipslice_twist_depth3 and get_corners_ud_edges_depth3.
+EXACT = os.environ.get('TWOPHASE_EXACT_PRUNING', '')
+if EXACT == '1':
+    EXACT = 'nibble'
+if EXACT not in ('', 'nibble', 'byte'):
+    raise ValueError('TWOPHASE_EXACT_PRUNING must be nibble or byte, not ' + EXACT)
+# phase 2 distance > 10, if the table is not filled completely. The complete table has no unfilled entries but distances
+# up to 18, so UNFILLED must not be 15 there.
+UNFILLED = 255 if FULL_PHASE2 else 15
+if EXACT == 'nibble' and FULL_PHASE2:  # the complete phase 2 table has distances up to 18
+    raise ValueError('TWOPHASE_FULL_PHASE2 needs TWOPHASE_EXACT_PRUNING=byte, the distances do not fit into 4 bits')
+
 flipslice_twist_depth3 = None  # global variables, initialized during pruning table cration
 corners_ud_edges_depth3 = None
+flipslice_twist_depth = None  # the exact tables, only with EXACT
+corners_ud_edges_depth = None
 cornslice_depth = None
 edgeslice_depth = None
 
@@ -32,6 +66,29 @@ def get_corners_ud_edges_depth3(ix):
     return y & 3
 
 
+def get_flipslice_twist_depth(ix):
+    """get_flipslice_twist_depth(ix) is *exactly* the number of moves to solve phase 1 of a cube with index ix. With
+    the byte table this function is replaced by the indexing of the table."""
+    return (flipslice_twist_depth[ix >> 1] >> ((ix & 1) << 2)) & 15
+
+
+def get_corners_ud_edges_depth(ix):
+    """get_corners_ud_edges_depth(ix) is *exactly* the number of moves to solve phase 2 of a cube with index ix, or
+    UNFILLED. With the byte table this function is replaced by the indexing of the table."""
+    return (corners_ud_edges_depth[ix >> 1] >> ((ix & 1) << 2)) & 15
+
+
+def _exact_flipslice_twist_depth3(ix):
+    """get_flipslice_twist_depth3 with the exact table."""
+    return get_flipslice_twist_depth(ix) % 3
+
+
+def _exact_corners_ud_edges_depth3(ix):
+    """get_corners_ud_edges_depth3 with the exact table."""
+    depth = get_corners_ud_edges_depth(ix)
+    return 3 if depth == UNFILLED else depth % 3
+
+
 def set_flipslice_twist_depth3(ix, value):
     shift = (ix % 16) * 2
     base = ix >> 4
@@ -53,7 +110,12 @@ def create_phase1_prun_table():
     global flipslice_twist_depth3
     total = defs.N_FLIPSLICE_CLASS * defs.N_TWIST
     fname = "phase1_prun"
-    if not path.isfile(fname):
+    flipslice_twist_depth3 = tb.load(fname, 'L', total // 16 + 1)
+    if flipslice_twist_depth3 is None and fastprun is not None:
+        print("creating " + fname + " table with NumPy...")
+        flipslice_twist_depth3 = fastprun.create_phase1_prun_table()
+        tb.save(fname, flipslice_twist_depth3)
+    if flipslice_twist_depth3 is None:
         print("creating " + fname + " table...")
         print('This may take half an hour or even longer, depending on the hardware.')
 
@@ -161,22 +223,20 @@ def create_phase1_prun_table():
             print()
             print('depth:', depth, 'done: ' + str(done) + '/' + str(total))
 
-        fh = open(fname, "wb")
-        flipslice_twist_depth3.tofile(fh)
-    else:
-        print("loading " + fname + " table...")
-        fh = open(fname, "rb")
-        flipslice_twist_depth3 = ar.array('L')
-        flipslice_twist_depth3.fromfile(fh, total // 16 + 1)
-    fh.close()
+        tb.save(fname, flipslice_twist_depth3)
 
 
 def create_phase2_prun_table():
     """Creates/loads the corners_ud_edges_depth3 pruning table for phase 2."""
     total = defs.N_CORNERS_CLASS * defs.N_UD_EDGES
-    fname = "phase2_prun"
+    fname = "phase2_prun_full" if FULL_PHASE2 else "phase2_prun"
     global corners_ud_edges_depth3
-    if not path.isfile(fname):
+    corners_ud_edges_depth3 = tb.load(fname, 'L', total // 16)
+    if corners_ud_edges_depth3 is None and fastprun is not None:
+        print("creating " + fname + " table with NumPy...")
+        corners_ud_edges_depth3 = fastprun.create_phase2_prun_table(None if FULL_PHASE2 else 10)
+        tb.save(fname, corners_ud_edges_depth3)
+    if corners_ud_edges_depth3 is None:
         print("creating " + fname + " table...")
 
         corners_ud_edges_depth3 = ar.array('L', [0xffffffff] * (total // 16))
@@ -204,7 +264,7 @@ def create_phase2_prun_table():
         done = 1
         depth = 0
         print('depth:', depth, 'done: ' + str(done) + '/' + str(total))
-        while depth < 10:  # we fill the table only do depth 9 + 1
+        while depth < PHASE2_MAX_LENGTH and done < total:  # only to depth 9 + 1 if not FULL_PHASE2
             depth3 = depth % 3
             idx = 0
             mult = 2
@@ -239,7 +299,7 @@ def create_phase2_prun_table():
                             ud_edge1 = sy.ud_edges_conj[(ud_edge1 << 4) + c1_sym]
                             idx1 = 40320 * c1_classidx + ud_edge1  # N_UD_EDGES = 40320
                             if get_corners_ud_edges_depth3(idx1) == 3:  # entry not yet filled
-                                set_corners_ud_edges_depth3(idx1, (depth + 1) % 3)  # depth + 1 <= 10
+                                set_corners_ud_edges_depth3(idx1, (depth + 1) % 3)  # depth + 1 <= PHASE2_MAX_LENGTH
                                 done += 1
                                 # ######symmetric position has eventually more than one representation #############
                                 sym = c_sym[c1_classidx]
@@ -262,16 +322,44 @@ def create_phase2_prun_table():
             print()
             print('depth:', depth, 'done: ' + str(done) + '/' + str(total))
 
-        print('remaining unfilled entries have depth >=11')
-        fh = open(fname, "wb")
-        corners_ud_edges_depth3.tofile(fh)
-    else:
-        print("loading " + fname + " table...")
-        fh = open(fname, "rb")
-        corners_ud_edges_depth3 = ar.array('L')
-        corners_ud_edges_depth3.fromfile(fh, total // 16)
+        if not FULL_PHASE2:
+            print('remaining unfilled entries have depth >=11')
+        tb.save(fname, corners_ud_edges_depth3)
+
+
+def create_exact_prun_tables():
+    """Creates/loads the flipslice_twist_depth and corners_ud_edges_depth pruning tables with the exact distances,
+    nibble or byte packed as given by EXACT."""
+    global flipslice_twist_depth, corners_ud_edges_depth, get_flipslice_twist_depth, get_corners_ud_edges_depth
+    global get_flipslice_twist_depth3, get_corners_ud_edges_depth3
+    per_byte = 2 if EXACT == 'nibble' else 1
 
-    fh.close()
+    total = defs.N_FLIPSLICE_CLASS * defs.N_TWIST
+    fname = "phase1_prun_" + EXACT
+    flipslice_twist_depth = tb.load(fname, 'B', -(-total // per_byte))
+    if flipslice_twist_depth is None:
+        if fastprun is None:
+            raise ImportError('the ' + fname + ' table can only be created with NumPy')
+        print("creating " + fname + " table with NumPy...")
+        flipslice_twist_depth = fastprun.create_phase1_prun_table(packing=EXACT)
+        tb.save(fname, flipslice_twist_depth)
+
+    total = defs.N_CORNERS_CLASS * defs.N_UD_EDGES
+    fname = ("phase2_prun_full_" if FULL_PHASE2 else "phase2_prun_") + EXACT
+    corners_ud_edges_depth = tb.load(fname, 'B', -(-total // per_byte))
+    if corners_ud_edges_depth is None:
+        if fastprun is None:
+            raise ImportError('the ' + fname + ' table can only be created with NumPy')
+        print("creating " + fname + " table with NumPy...")
+        corners_ud_edges_depth = fastprun.create_phase2_prun_table(None if FULL_PHASE2 else 10, packing=EXACT,
+                                                                   unfilled=UNFILLED)
+        tb.save(fname, corners_ud_edges_depth)
+
+    if EXACT == 'byte':
+        get_flipslice_twist_depth = flipslice_twist_depth.__getitem__
+        get_corners_ud_edges_depth = corners_ud_edges_depth.__getitem__
+    get_flipslice_twist_depth3 = _exact_flipslice_twist_depth3
+    get_corners_ud_edges_depth3 = _exact_corners_ud_edges_depth3
 
 
 def create_phase2_cornsliceprun_table():
@@ -279,7 +367,8 @@ def create_phase2_cornsliceprun_table():
     at the beginning of phase 2."""
     fname = "phase2_cornsliceprun"
     global cornslice_depth
-    if not path.isfile(fname):
+    cornslice_depth = tb.load(fname, 'b', defs.N_CORNERS * defs.N_PERM_4)
+    if cornslice_depth is None:
         print("creating " + fname + " table...")
         cornslice_depth = ar.array('b', [-1] * (defs.N_CORNERS * defs.N_PERM_4))
         corners = 0  # values for solved phase 2
@@ -305,14 +394,7 @@ def create_phase2_cornsliceprun_table():
 
             depth += 1
         print()
-        fh = open(fname, "wb")
-        cornslice_depth.tofile(fh)
-    else:
-        print("loading " + fname + " table...")
-        fh = open(fname, "rb")
-        cornslice_depth = ar.array('b')
-        cornslice_depth.fromfile(fh, defs.N_CORNERS * defs.N_PERM_4)
-    fh.close()
+        tb.save(fname, cornslice_depth)
 
 # array distance computes the new distance from the old_distance i and the new_distance_mod3 j. ########################
 # We need this array because the pruning tables only store the distances mod 3. ########################################
@@ -325,6 +407,9 @@ for i in range(20):
         elif i % 3 == 0 and j == 2:
             distance[3 * i + j] -= 3
 
-create_phase1_prun_table()
-create_phase2_prun_table()
+if EXACT:
+    create_exact_prun_tables()
+else:
+    create_phase1_prun_table()
+    create_phase2_prun_table()
 create_phase2_cornsliceprun_table()
@@ -1,18 +1,175 @@
 # ################### The SolverThread class solves implements the two phase algorithm #################################
 import face
 import threading as thr
+import multiprocessing as mp
 import cubie
 import symmetries as sy
 import coord
 import enums as en
 import moves as mv
 import pruning as pr
+import endgame
 import time
+import queue
+from defs import N_MOVE
+
+# With fork the child processes share the already loaded move and pruning tables with the parent process (the pages are
+# only copied on write, and the tables are never written). Platforms without fork have to load the tables per process.
+if 'fork' in mp.get_all_start_methods():
+    mp_context = mp.get_context('fork')
+else:
+    mp_context = mp.get_context()
+
+# The search threads add their node counts to the shared statistics and check the hard time limit, the node budget and
+# the terminated event of the other threads only every CHECK_INTERVAL nodes. With a node budget the threads check
+# before their first node and then at the latest after an eighth of their share of the remaining budget, so the budget
+# is exceeded by at most about an eighth, also if it is much smaller than CHECK_INTERVAL.
+CHECK_INTERVAL = 1024
+N_SEARCHES = 6  # the cube and its inverse in the three rotations, see solve
+
+# Reasons why the search was stopped, stored in the shared statistics.
+FINISHED = 0  # the target length was reached or the search space was exhausted
+TIMEOUT = 1  # the soft timeout with a solution or the hard time limit was reached
+NODE_BUDGET = 2  # the maximal number of nodes was reached
+STATUS = ('finished', 'timeout', 'node_budget')
+
+
+KERNELS = ('recursive', 'iterative', 'numpy')  # see SolverThread parameter kernel
+
+
+def check_kernel(kernel):
+    if kernel not in KERNELS:
+        raise ValueError('Unknown search kernel: ' + str(kernel))
+
+
+def new_counters():
+    """The search counters of one thread, see SolverThread parameter count."""
+    return {'nodes_phase1': [0] * 21,  # nodes per phase 1 depth
+            'nodes_phase2': [0] * (pr.PHASE2_MAX_LENGTH + 2),  # nodes per phase 2 depth
+            'pruned_phase1': 0,  # children pruned by flipslice_twist_depth3
+            'pruned_phase2': 0,  # children pruned by corners_ud_edges_depth3
+            'pruned_cornslice': 0,  # children pruned by cornslice_depth
+            'phase2_entries': 0,  # solved phase 1 maneuvers
+            'phase2_prechecks': 0,  # solved phase 1 maneuvers rejected by the cornslice_depth precheck
+            'first_solution': None,  # time in seconds until the first solution was found
+            'best_solution': None}  # time in seconds until the best solution was found
+
+
+def merge_counters(counters_list):
+    """Aggregates the counters of several threads."""
+    total = new_counters()
+    best_length = 999
+    for c in counters_list:
+        for key in ('nodes_phase1', 'nodes_phase2'):
+            total[key] = [a + b for a, b in zip(total[key], c[key])]
+        for key in ('pruned_phase1', 'pruned_phase2', 'pruned_cornslice', 'phase2_entries', 'phase2_prechecks'):
+            total[key] += c[key]
+        if c['first_solution'] is not None:
+            if total['first_solution'] is None or c['first_solution'] < total['first_solution']:
+                total['first_solution'] = c['first_solution']
+            length, t = c['best_solution']
+            if length < best_length or (length == best_length and t < total['best_solution']):
+                best_length = length
+                total['best_solution'] = t
+    return total
+
+
+# ############################ children of a node which survive the pruning ##########################################
+# The search kernels SolverThread.search and SolverThread.search_phase2 get the children of a node from one of these
+# functions, depending on the kernel and the pruning tables. The functions for the exact pruning tables, see
+# pruning.EXACT, read the distance of a child directly instead of computing it from the distance of the node and the
+# distance mod 3 of the child. The kernel 'numpy' uses frontier.phase1_children.
+
+def phase1_children(flip, twist, slice_sorted, dist, togo_phase1, moves):
+    """Returns the children of a phase 1 node with distance < togo_phase1 to the subgroup H, as list of
+    (dist, move, flip, twist, slice_sorted) tuples in the order of moves."""
+    children = []
+    # most children are pruned, so the tables are bound to local names and pr.get_flipslice_twist_depth3 is inlined
+    flip_move, twist_move, slice_sorted_move = mv.flip_move, mv.twist_move, mv.slice_sorted_move
+    flipslice_classidx, flipslice_sym, twist_conj = sy.flipslice_classidx, sy.flipslice_sym, sy.twist_conj
+    depth3, distance = pr.flipslice_twist_depth3, pr.distance
+    for m in moves:
+        flip_new = flip_move[18 * flip + m]  # N_MOVE = 18
+        twist_new = twist_move[18 * twist + m]
+        slice_sorted_new = slice_sorted_move[18 * slice_sorted + m]
+
+        flipslice = 2048 * (slice_sorted_new // 24) + flip_new  # N_FLIP * (slice_sorted // N_PERM_4) + flip
+        ix = 2187 * flipslice_classidx[flipslice] + twist_conj[(twist_new << 4) + flipslice_sym[flipslice]]
+        dist_new = distance[3 * dist + ((depth3[ix >> 4] >> ((ix & 15) << 1)) & 3)]
+        if dist_new >= togo_phase1:  # impossible to reach subgroup H in togo_phase1 - 1 moves
+            continue
+        children.append((dist_new, m, flip_new, twist_new, slice_sorted_new))
+    return children
+
+
+def phase1_children_exact(flip, twist, slice_sorted, dist, togo_phase1, moves):
+    """The same as phase1_children for the exact pruning tables."""
+    children = []
+    flip_move, twist_move, slice_sorted_move = mv.flip_move, mv.twist_move, mv.slice_sorted_move
+    flipslice_classidx, flipslice_sym, twist_conj = sy.flipslice_classidx, sy.flipslice_sym, sy.twist_conj
+    depth, nibble = pr.flipslice_twist_depth, pr.EXACT == 'nibble'
+    for m in moves:
+        flip_new = flip_move[18 * flip + m]
+        twist_new = twist_move[18 * twist + m]
+        slice_sorted_new = slice_sorted_move[18 * slice_sorted + m]
+
+        flipslice = 2048 * (slice_sorted_new // 24) + flip_new
+        ix = 2187 * flipslice_classidx[flipslice] + twist_conj[(twist_new << 4) + flipslice_sym[flipslice]]
+        dist_new = (depth[ix >> 1] >> ((ix & 1) << 2)) & 15 if nibble else depth[ix]
+        if dist_new >= togo_phase1:
+            continue
+        children.append((dist_new, m, flip_new, twist_new, slice_sorted_new))
+    return children
+
+
+def phase2_children(corners, ud_edges, slice_sorted, dist, togo_phase2, moves):
+    """Returns the children of a phase 2 node with distance < togo_phase2 in the corners_ud_edges pruning table, as list
+    of (dist, cornslice_dist, move, corners, ud_edges, slice_sorted) tuples in the order of moves. cornslice_dist is
+    the distance in the cornslice pruning table, which is not checked here."""
+    children = []
+    # the same local names as in phase1_children, pr.get_corners_ud_edges_depth3 is inlined
+    corners_move, ud_edges_move, slice_sorted_move = mv.corners_move, mv.ud_edges_move, mv.slice_sorted_move
+    corner_classidx, corner_sym, ud_edges_conj = sy.corner_classidx, sy.corner_sym, sy.ud_edges_conj
+    depth3, distance = pr.corners_ud_edges_depth3, pr.distance
+    for m in moves:
+        corners_new = corners_move[18 * corners + m]
+        ud_edges_new = ud_edges_move[18 * ud_edges + m]
+
+        ix = 40320 * corner_classidx[corners_new] + ud_edges_conj[(ud_edges_new << 4) + corner_sym[corners_new]]
+        dist_new = distance[3 * dist + ((depth3[ix >> 4] >> ((ix & 15) << 1)) & 3)]
+        if dist_new >= togo_phase2:  # impossible to reach solved cube in togo_phase2 - 1 moves
+            continue
+        slice_sorted_new = slice_sorted_move[18 * slice_sorted + m]
+        children.append((dist_new, pr.cornslice_depth[24 * corners_new + slice_sorted_new], m, corners_new,
+                         ud_edges_new, slice_sorted_new))
+    return children
+
+
+def phase2_children_exact(corners, ud_edges, slice_sorted, dist, togo_phase2, moves):
+    """The same as phase2_children for the exact pruning tables."""
+    children = []
+    corners_move, ud_edges_move, slice_sorted_move = mv.corners_move, mv.ud_edges_move, mv.slice_sorted_move
+    corner_classidx, corner_sym, ud_edges_conj = sy.corner_classidx, sy.corner_sym, sy.ud_edges_conj
+    depth, nibble = pr.corners_ud_edges_depth, pr.EXACT == 'nibble'
+    for m in moves:
+        corners_new = corners_move[18 * corners + m]
+        ud_edges_new = ud_edges_move[18 * ud_edges + m]
+
+        ix = 40320 * corner_classidx[corners_new] + ud_edges_conj[(ud_edges_new << 4) + corner_sym[corners_new]]
+        dist_new = (depth[ix >> 1] >> ((ix & 1) << 2)) & 15 if nibble else depth[ix]
+        if dist_new >= togo_phase2:
+            continue
+        slice_sorted_new = slice_sorted_move[18 * slice_sorted + m]
+        children.append((dist_new, pr.cornslice_depth[24 * corners_new + slice_sorted_new], m, corners_new,
+                         ud_edges_new, slice_sorted_new))
+    return children
 
 
 class SolverThread(thr.Thread):
 
-    def __init__(self, cb_cube, rot, inv, ret_length, timeout, start_time, solutions, terminated, shortest_length):
+    def __init__(self, cb_cube, rot, inv, ret_length, timeout, start_time, solutions, terminated, shortest_length,
+                 lock=None, kernel='recursive', callback=None, deadline=None, max_nodes=None, stats=None, count=False,
+                 tt_size=0, tt_exact=True, conj_bounds=False, ordered=False):
         """
         :param cb_cube: The cube to be solved in CubieCube representation
         :param rot: Rotates the  cube 120° * rot along the long diagonal before applying the two-phase-algorithm
@@ -28,6 +185,34 @@ class SolverThread(thr.Thread):
         :param solutions: An array with the found solutions found by the six parallel threads
         :param terminated: An event shared by the six threads to signal a termination request
         :param shortest_length: The length of the shortes solutions in the solution array
+        :param lock: A lock shared by the six threads which protects the solution array. If None the thread uses its
+         own lock.
+        :param kernel: 'recursive': search with one recursive function call per node. 'iterative': the same search
+         with an explicit stack instead of the recursion, see search_iterative. It is slower than 'recursive' and
+         only kept for comparison with benchmark.py. 'numpy': like 'recursive', but all phase 1 children of a node are
+         evaluated at once with NumPy, see frontier.py. All kernels generate exactly the same solutions. All options
+         below can be combined with each other and with all kernels.
+        :param callback: If not None, callback(maneuver) is called each time a shorter solution is stored in the
+         solution array. It is called while the lock is held.
+        :param deadline: If not None, the search stops at this time.monotonic() value, even if no solution has been
+         found yet.
+        :param max_nodes: If not None, the search stops when the threads together have searched max_nodes nodes.
+        :param stats: A list or a multiprocessing array [nodes, status] shared by the threads. nodes is the number of
+         nodes searched by all threads, status is FINISHED, TIMEOUT or NODE_BUDGET. If None the thread uses its own.
+        :param count: If True, the thread counts the nodes per depth, the pruned children, the phase 2 entries and the
+         solution times in the dictionary counters, see new_counters.
+        :param tt_size: If > 0, phase 1 uses a transposition table with at most tt_size entries (about 100 bytes each)
+         to skip subtrees which already have been searched in the current iteration, see tt_lookup.
+        :param tt_exact: If True, the key of the transposition table is the complete cube, so the search finds the same
+         solutions as without the table. If False, the key only contains the phase 1 coordinates flip, twist and
+         slice_sorted. This skips many more subtrees, but also phase 1 solutions which lead to different phase 2
+         positions, so solutions may be missed.
+        :param conj_bounds: If True, phase 1 also tracks the phase 1 coordinates of the cube conjugated by the 120°
+         rotations, see prune_conj. Their distances to the subgroup H are lower bounds for the length of the complete
+         solution, so nodes which cannot lead to a shorter solution are pruned.
+        :param ordered: If True, the children of a node are searched in the order of their pruning distance. Ties are
+         broken by the corner-slice distance in phase 2 and by the fixed move order in phase 1. The search tree is the
+         same, but short solutions are usually found earlier.
         """
         thr.Thread.__init__(self)
         self.cb_cube = cb_cube  # CubieCube
@@ -36,142 +221,451 @@ class SolverThread(thr.Thread):
         self.inv = inv
         self.sofar_phase1 = None
         self.sofar_phase2 = None
-        self.lock = thr.Lock()
+        # the current phase 2 search has found a solution. Only used with the full phase 2 table, see store_solution
+        self.phase2_solved = False
+        if lock is None:
+            lock = thr.Lock()
+        self.lock = lock
         self.ret_length = ret_length
         self.timeout = timeout
         self.start_time = start_time
+        self.callback = callback
+        self.deadline = deadline
+        self.max_nodes = max_nodes
+        if stats is None:
+            stats = [0, FINISHED]
+        self.stats = stats
+        self.nodes = 0  # nodes searched by this thread
+        self.nodes_reported = 0  # nodes already added to stats
+        self.next_check = self.check_interval(0)
+        self.counters = new_counters() if count else None
+        self.tt = set() if tt_size > 0 else None
+        self.tt_size = tt_size
+        self.tt_exact = tt_exact
+        self.tt_stats = [0, 0, 0]  # lookups, hits and entries not stored because the table was full
 
-        self.cornersave = 0
+        # the corners, u_edges and d_edges coordinates after each move of sofar_phase1. Only the entries up to
+        # valid_depth belong to the current path, the others are recomputed when phase 1 is solved.
+        self.corners_d = [0] * 21
+        self.u_edges_d = [0] * 21
+        self.d_edges_d = [0] * 21
+        self.valid_depth = 0
+
+        # the phase 1 coordinates (flip, twist, slice_sorted, dist) of the two conjugated cubes after each move of
+        # sofar_phase1, valid up to conj_valid
+        self.conj_bounds = conj_bounds
+        self.conj_d = [None] * 21
+        self.conj_valid = 0
+        self.ordered = ordered
+
+        check_kernel(kernel)
+        self.next_moves_phase1 = mv.next_moves_phase1
+        self.next_moves_phase1_end = mv.next_moves_phase1_end
+        if kernel == 'numpy':
+            import frontier  # the NumPy views of the tables are only created if needed
+            self.phase1_children = frontier.phase1_children
+            self.next_moves_phase1 = frontier.next_moves_phase1
+            self.next_moves_phase1_end = frontier.next_moves_phase1_end
+        elif pr.EXACT:
+            self.phase1_children = phase1_children_exact
+        else:
+            self.phase1_children = phase1_children
+        self.phase2_children = phase2_children_exact if pr.EXACT else phase2_children
+        self.phase1_search = self.search
+        self.phase2_search = self.search_phase2
+        if kernel == 'iterative':
+            self.phase1_search = self.search_iterative
+            self.phase2_search = self.search_phase2_iterative
+            self.children_phase1_d = [()] * 21  # the stack of search_iterative
+            self.next_phase1_d = [0] * 21
+            self.check_conj_d = [False] * 21
+            self.children_phase2_d = [()] * (pr.PHASE2_MAX_LENGTH + 1)  # the stack of search_phase2_iterative
+            self.next_phase2_d = [0] * (pr.PHASE2_MAX_LENGTH + 1)
 
         # these variables are shared by the six threads, initialized in function solve
         self.solutions = solutions
         self.terminated = terminated
         self.shortest_length = shortest_length
+        # terminated mirrored in a plain attribute, a multiprocessing event is too slow to be checked in every node.
+        # It is refreshed every CHECK_INTERVAL nodes and set at once when this thread stops the search.
+        self.stopped = False
+
+    def check_interval(self, nodes):
+        """The number of nodes until the next check, if the threads together have searched nodes nodes."""
+        if self.max_nodes is None:
+            return CHECK_INTERVAL
+        return max(1, min(CHECK_INTERVAL, (self.max_nodes - nodes) // (8 * N_SEARCHES)))
+
+    def check_budget(self):
+        """Adds the nodes searched since the last check to the shared statistics and terminates all threads if the hard
+        time limit or the node budget has been exceeded."""
+        self.lock.acquire()
+        self.stats[0] += self.nodes - self.nodes_reported
+        self.nodes_reported = self.nodes
+        self.next_check = self.nodes + self.check_interval(self.stats[0])
+        if self.terminated.is_set():  # the search already has been stopped for some other reason
+            self.stopped = True
+        elif self.max_nodes is not None and self.stats[0] >= self.max_nodes:
+            self.stats[1] = NODE_BUDGET
+            self.stop()
+        elif self.deadline is not None and time.monotonic() > self.deadline:
+            self.stats[1] = TIMEOUT
+            self.stop()
+        self.lock.release()
+
+    def stop(self):
+        """Stops the search of all threads."""
+        self.stopped = True
+        self.terminated.set()
+
+    def store_solution(self):
+        """Phase 2 is solved, store the solution sofar_phase1 + sofar_phase2 if it is shorter than the solutions found
+        so far."""
+        if pr.FULL_PHASE2:
+            # The remaining phase 2 maneuvers of this phase 1 solution cannot give a shorter solution. With the full
+            # table they may have up to 18 moves, and searching them all takes minutes, so we stop at once.
+            self.phase2_solved = True
+        self.lock.acquire()
+        man = self.sofar_phase1 + self.sofar_phase2
+        if len(self.solutions) == 0 or (len(self.solutions[-1]) > len(man)):
+
+            if self.inv == 1:  # we solved the inverse cube
+                man = list(reversed(man))
+                man[:] = [en.Move((m // 3) * 3 + (2 - m % 3)) for m in man]  # R1->R3, R2->R2, R3->R1 etc.
+            man[:] = [en.Move(sy.conj_move[m, 16 * self.rot]) for m in man]
+            self.solutions.append(man)
+            self.shortest_length[0] = len(man)
+            if self.callback is not None:
+                self.callback(man)
+            if self.counters is not None:
+                t = time.monotonic() - self.start_time
+                if self.counters['first_solution'] is None:
+                    self.counters['first_solution'] = t
+                self.counters['best_solution'] = (len(man), t)  # the length is removed in merge_counters
+
+        if self.shortest_length[0] <= self.ret_length:  # we have reached the target length
+            self.stop()
+        self.lock.release()
 
     def search_phase2(self, corners, ud_edges, slice_sorted, dist, togo_phase2):
         # ##############################################################################################################
-        if self.terminated.is_set():
+        if self.stopped or self.phase2_solved:
             return
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.check_budget()
+        counters = self.counters
+        if counters is not None:
+            counters['nodes_phase2'][len(self.sofar_phase2)] += 1
         ################################################################################################################
         if togo_phase2 == 0:
-            self.lock.acquire()  # phase 2 solved, store solution
-            man = self.sofar_phase1 + self.sofar_phase2
-            if len(self.solutions) == 0 or (len(self.solutions[-1]) > len(man)):
-
-                if self.inv == 1:  # we solved the inverse cube
-                    man = list(reversed(man))
-                    man[:] = [en.Move((m // 3) * 3 + (2 - m % 3)) for m in man]  # R1->R3, R2->R2, R3->R1 etc.
-                man[:] = [en.Move(sy.conj_move[m, 16 * self.rot]) for m in man]
-                self.solutions.append(man)
-                self.shortest_length[0] = len(man)
-
-            if self.shortest_length[0] <= self.ret_length:  # we have reached the target length
-                self.terminated.set()
-            self.lock.release()
+            self.store_solution()
         else:
-            for m in en.Move:
-                if m in [en.Move.R1, en.Move.R3, en.Move.F1, en.Move.F3,
-                         en.Move.L1, en.Move.L3, en.Move.B1, en.Move.B3]:
+            if self.sofar_phase2:
+                last = self.sofar_phase2[-1]
+            elif self.sofar_phase1:
+                last = self.sofar_phase1[-1]
+            else:
+                last = N_MOVE  # no previous move
+            moves = mv.next_moves_phase2[last]  # only phase 2 moves which may follow the last move
+            children = self.phase2_children(corners, ud_edges, slice_sorted, dist, togo_phase2, moves)
+            if counters is not None:
+                counters['pruned_phase2'] += len(moves) - len(children)
+            if self.ordered:
+                children.sort()
+            for dist_new, cornslice_new, m, corners_new, ud_edges_new, slice_sorted_new in children:
+                if cornslice_new >= togo_phase2:  # impossible to reach solved cube in togo_phase2 - 1 moves
+                    if counters is not None:
+                        counters['pruned_cornslice'] += 1
                     continue
 
-                if len(self.sofar_phase2) > 0:
-                    diff = self.sofar_phase2[-1] // 3 - m // 3
-                    if diff in [0, 3]:  # successive moves: on same face or on same axis with wrong order
-                        continue
-                else:
-                    if len(self.sofar_phase1) > 0:
-                        diff = self.sofar_phase1[-1] // 3 - m // 3
-                        if diff in [0, 3]:  # successive moves: on same face or on same axis with wrong order
-                            continue
-
-                corners_new = mv.corners_move[18 * corners + m]
-                ud_edges_new = mv.ud_edges_move[18 * ud_edges + m]
-                slice_sorted_new = mv.slice_sorted_move[18 * slice_sorted + m]
-
-                classidx = sy.corner_classidx[corners_new]
-                sym = sy.corner_sym[corners_new]
-                dist_new_mod3 = pr.get_corners_ud_edges_depth3(
-                    40320 * classidx + sy.ud_edges_conj[(ud_edges_new << 4) + sym])
-                dist_new = pr.distance[3 * dist + dist_new_mod3]
-                if max(dist_new, pr.cornslice_depth[24 * corners_new + slice_sorted_new]) >= togo_phase2:
-                    continue  # impossible to reach solved cube in togo_phase2 - 1 moves
-
                 self.sofar_phase2.append(m)
                 self.search_phase2(corners_new, ud_edges_new, slice_sorted_new, dist_new, togo_phase2 - 1)
                 self.sofar_phase2.pop(-1)
 
+    def start_phase2(self, slice_sorted):
+        """Phase 1 is solved with the moves in sofar_phase1. Compute the initial phase 2 coordinates and search for the
+        phase 2 solutions."""
+        if time.monotonic() > self.start_time + self.timeout and len(self.solutions) > 0 and \
+                not self.terminated.is_set():
+            self.stats[1] = TIMEOUT
+            self.stop()
+
+        # compute initial phase 2 coordinates. Consecutive phase 1 solutions share most of their moves, so only the
+        # moves after valid_depth have to be applied to the cached coordinates
+        n = len(self.sofar_phase1)
+        corners_d, u_edges_d, d_edges_d = self.corners_d, self.u_edges_d, self.d_edges_d
+        for i in range(self.valid_depth, n):
+            m = self.sofar_phase1[i]
+            corners_d[i + 1] = mv.corners_move[18 * corners_d[i] + m]
+            u_edges_d[i + 1] = mv.u_edges_move[18 * u_edges_d[i] + m]
+            d_edges_d[i + 1] = mv.d_edges_move[18 * d_edges_d[i] + m]
+        self.valid_depth = n
+        corners = corners_d[n]
+
+        # new solution must be shorter and we do not use phase 2 maneuvers with length > pr.PHASE2_MAX_LENGTH, the
+        # pruning table is only filled up to this length
+        togo2_limit = min(self.shortest_length[0] - n, pr.PHASE2_MAX_LENGTH + 1)
+        if self.counters is not None:
+            self.counters['phase2_entries'] += 1
+        if pr.cornslice_depth[24 * corners + slice_sorted] >= togo2_limit:  # this precheck speeds up the computation
+            if self.counters is not None:
+                self.counters['phase2_prechecks'] += 1
+            return
+
+        u_edges = u_edges_d[n]
+        d_edges = d_edges_d[n]
+        ud_edges = coord.u_edges_plus_d_edges_to_ud_edges[24 * u_edges + d_edges % 24]
+
+        dist2 = self.co_cube.get_depth_phase2(corners, ud_edges)
+        self.phase2_solved = False
+        for togo2 in range(dist2, togo2_limit):  # do not use more than togo2_limit - 1 moves in phase 2
+            if self.phase2_solved:
+                break  # longer phase 2 maneuvers cannot give a shorter solution
+            self.sofar_phase2 = []
+            self.phase2_search(corners, ud_edges, slice_sorted, dist2, togo2)
+
     def search(self, flip, twist, slice_sorted, dist, togo_phase1):
         # ##############################################################################################################
-        if self.terminated.is_set():
+        if self.stopped:
             return
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.check_budget()
+        depth = len(self.sofar_phase1)
+        counters = self.counters
+        if counters is not None:
+            counters['nodes_phase1'][depth] += 1
         ################################################################################################################
         if togo_phase1 == 0:  # phase 1 solved
-
-            if time.monotonic() > self.start_time + self.timeout and len(self.solutions) > 0:
-                self.terminated.set()
-
-            # compute initial phase 2 coordinates
-            if self.sofar_phase1:  # check if list is not empty
-                m = self.sofar_phase1[-1]
+            self.start_phase2(slice_sorted)
+        else:
+            if self.sofar_phase1:
+                last = self.sofar_phase1[-1]
             else:
-                m = en.Move.U1  # value is irrelevant here, no phase 1 moves
-
-            if m in [en.Move.R3, en.Move.F3, en.Move.L3, en.Move.B3]:  # phase 1 solution come in pairs
-                corners = mv.corners_move[18 * self.cornersave + m - 1]  # apply R2, F2, L2 ord B2 on last ph1 solution
+                last = N_MOVE  # no previous move
+            if self.tt is not None and self.tt_lookup(flip, twist, slice_sorted, togo_phase1, last, depth):
+                return  # the subtree has already been searched in this iteration
+            # dist = 0 means that we are already are in the subgroup H. If there are less than 5 moves left
+            # this forces all remaining moves to be phase 2 moves. So we can forbid these at the end of phase 1
+            # and generate these moves in phase 2.
+            if dist == 0 and togo_phase1 < 5:
+                moves = self.next_moves_phase1_end[last]
             else:
-                corners = self.co_cube.corners
-                for m in self.sofar_phase1:  # get current corner configuration
-                    corners = mv.corners_move[18 * corners + m]
-                self.cornersave = corners
-
-            # new solution must be shorter and we do not use phase 2 maneuvers with length > 11 - 1 = 10
-            togo2_limit = min(self.shortest_length[0] - len(self.sofar_phase1), 11)
-            if pr.cornslice_depth[24 * corners + slice_sorted] >= togo2_limit: # this precheck speeds up the computation
-                return
-
-            u_edges = self.co_cube.u_edges
-            d_edges = self.co_cube.d_edges
-            for m in self.sofar_phase1:
-                u_edges = mv.u_edges_move[18 * u_edges + m]
-                d_edges = mv.d_edges_move[18 * d_edges + m]
-            ud_edges = coord.u_edges_plus_d_edges_to_ud_edges[24 * u_edges + d_edges % 24]
-
-            dist2 = self.co_cube.get_depth_phase2(corners, ud_edges)
-            for togo2 in range(dist2, togo2_limit):  # do not use more than togo2_limit - 1 moves in phase 2
-                self.sofar_phase2 = []
-                self.search_phase2(corners, ud_edges, slice_sorted, dist2, togo2)
-
-        else:
-            for m in en.Move:
-                # dist = 0 means that we are already are in the subgroup H. If there are less than 5 moves left
-                # this forces all remaining moves to be phase 2 moves. So we can forbid these at the end of phase 1
-                # and generate these moves in phase 2.
-                if dist == 0 and togo_phase1 < 5 and m in [en.Move.U1, en.Move.U2, en.Move.U3, en.Move.R2,
-                                                           en.Move.F2, en.Move.D1, en.Move.D2, en.Move.D3,
-                                                           en.Move.L2, en.Move.B2]:
-                    continue
-
-                if len(self.sofar_phase1) > 0:
-                    diff = self.sofar_phase1[-1] // 3 - m // 3
-                    if diff in [0, 3]:  # successive moves: on same face or on same axis with wrong order
-                        continue
-
-                flip_new = mv.flip_move[18 * flip + m]  # N_MOVE = 18
-                twist_new = mv.twist_move[18 * twist + m]
-                slice_sorted_new = mv.slice_sorted_move[18 * slice_sorted + m]
-
-                flipslice = 2048 * (slice_sorted_new // 24) + flip_new  # N_FLIP * (slice_sorted // N_PERM_4) + flip
-                classidx = sy.flipslice_classidx[flipslice]
-                sym = sy.flipslice_sym[flipslice]
-                dist_new_mod3 = pr.get_flipslice_twist_depth3(2187 * classidx + sy.twist_conj[(twist_new << 4) + sym])
-                dist_new = pr.distance[3 * dist + dist_new_mod3]
-                if dist_new >= togo_phase1:  # impossible to reach subgroup H in togo_phase1 - 1 moves
-                    continue
+                moves = self.next_moves_phase1[last]
+            children = self.phase1_children(flip, twist, slice_sorted, dist, togo_phase1, moves)
+            if counters is not None:
+                counters['pruned_phase1'] += len(moves) - len(children)
+            if self.ordered:
+                children.sort()
+            track = self.tt is not None and self.tt_exact  # the key of the table needs the coordinates of this depth
+            conj_bounds = self.conj_bounds
+            check_conj = conj_bounds and depth + 13 >= self.shortest_length[0]  # the distance to H is at most 12
+            for dist_new, m, flip_new, twist_new, slice_sorted_new in children:
+                if check_conj:
+                    if self.prune_conj(depth, m):
+                        continue  # no shorter solution in this subtree
+                elif conj_bounds and self.conj_valid > depth:
+                    self.conj_valid = depth
 
+                if track:
+                    self.corners_d[depth + 1] = mv.corners_move[18 * self.corners_d[depth] + m]
+                    self.u_edges_d[depth + 1] = mv.u_edges_move[18 * self.u_edges_d[depth] + m]
+                    self.d_edges_d[depth + 1] = mv.d_edges_move[18 * self.d_edges_d[depth] + m]
+                    self.valid_depth = depth + 1
+                elif self.valid_depth > depth:
+                    self.valid_depth = depth  # the move at this depth changes
                 self.sofar_phase1.append(m)
                 self.search(flip_new, twist_new, slice_sorted_new, dist_new, togo_phase1 - 1)
                 self.sofar_phase1.pop(-1)
 
+    # ###################### phase 1 transposition table, used with tt_size > 0 #########################################
+    # Different phase 1 maneuvers of the same length may lead to the same position. If the position has already been
+    # searched with the same number of remaining moves in the current iteration, the subtree is skipped.
+
+    def tt_lookup(self, flip, twist, slice_sorted, togo_phase1, last, depth):
+        """Returns True if the node has already been searched in the current iteration, else stores it in the
+        transposition table if the table is not full."""
+        # the allowed moves in the subtree depend on the face of the last move, so it is part of the key
+        key = ((2187 * flip + twist) * 11880 + slice_sorted) * 147 + 7 * togo_phase1 + last // 3
+        if self.tt_exact:  # the coordinates of the corners and edges are kept up to date per depth in search
+            key = ((key * 40320 + self.corners_d[depth]) * 11880 + self.u_edges_d[depth]) * 11880 + \
+                self.d_edges_d[depth]
+        self.tt_stats[0] += 1
+        if key in self.tt:
+            self.tt_stats[1] += 1
+            return True
+        if len(self.tt) < self.tt_size:
+            self.tt.add(key)
+        else:
+            self.tt_stats[2] += 1
+        return False
+
+    # ############### phase 1 lower bounds of the conjugated cubes, used with conj_bounds ###############################
+    # The distance of the cube to the subgroup H of the RL axis and of the FB axis is the distance to H of the cube
+    # conjugated by the 120° rotations. A solution through a node at depth d has at least d + max(distances) moves.
+    # The coordinates of the conjugated cubes are only updated if this bound can reach the length of the shortest
+    # solution found so far, before no node can be pruned.
+
+    def move_conj(self, coords, m):
+        """Applies the move m of the cube to the coordinates ((flip, twist, slice_sorted, dist), ...) of the two
+        conjugated cubes."""
+        result = []
+        for r in (1, 2):
+            flip, twist, slice_sorted, dist = coords[r - 1]
+            m_r = sy.conj_rot[r][m]
+            flip = mv.flip_move[18 * flip + m_r]
+            twist = mv.twist_move[18 * twist + m_r]
+            slice_sorted = mv.slice_sorted_move[18 * slice_sorted + m_r]
+            flipslice = 2048 * (slice_sorted // 24) + flip
+            dist = pr.distance[3 * dist + pr.get_flipslice_twist_depth3(
+                2187 * sy.flipslice_classidx[flipslice] + sy.twist_conj[(twist << 4) + sy.flipslice_sym[flipslice]])]
+            result.append((flip, twist, slice_sorted, dist))
+        return result
+
+    def prune_conj(self, depth, m):
+        """Updates the coordinates of the conjugated cubes along the current path and after the move m at depth.
+        Returns True if their distances show that the subtree of the move has no shorter solution."""
+        conj_d = self.conj_d
+        for i in range(min(self.conj_valid, depth), depth):  # update the coordinates along the current path
+            conj_d[i + 1] = self.move_conj(conj_d[i], self.sofar_phase1[i])
+        conj_d[depth + 1] = self.move_conj(conj_d[depth], m)
+        if depth + 1 + max(conj_d[depth + 1][0][3], conj_d[depth + 1][1][3]) >= self.shortest_length[0]:
+            self.conj_valid = depth
+            return True
+        self.conj_valid = depth + 1
+        return False
+
+    # ###################### non-recursive search kernel, selected with kernel='iterative' ###############################
+    # The same search as search and search_phase2, in the same order, with an explicit stack instead of one function
+    # call per node. The children of the nodes on the current path and the index of the next child to search are kept
+    # in the per-depth lists children_d and next_d, which are allocated once per thread.
+
+    def search_phase2_iterative(self, corners, ud_edges, slice_sorted, dist, togo_phase2):
+        sofar = self.sofar_phase2
+        children_d, next_d = self.children_phase2_d, self.next_phase2_d
+        counters = self.counters
+        togo_start = togo_phase2
+        depth = 0
+        while True:
+            # ## enter the node (corners, ud_edges, slice_sorted, dist) with togo_phase2 moves left ##################
+            # After a stop the node has no children, but the parents go through their remaining children like in
+            # search_phase2, so the counters are the same.
+            children = ()
+            if not (self.stopped or self.phase2_solved):
+                self.nodes += 1
+                if self.nodes >= self.next_check:
+                    self.check_budget()
+                if counters is not None:
+                    counters['nodes_phase2'][depth] += 1
+                if togo_phase2 == 0:
+                    self.store_solution()
+                else:
+                    if sofar:
+                        last = sofar[-1]
+                    elif self.sofar_phase1:
+                        last = self.sofar_phase1[-1]
+                    else:
+                        last = N_MOVE  # no previous move
+                    moves = mv.next_moves_phase2[last]
+                    children = self.phase2_children(corners, ud_edges, slice_sorted, dist, togo_phase2, moves)
+                    if counters is not None:
+                        counters['pruned_phase2'] += len(moves) - len(children)
+                    if self.ordered:
+                        children.sort()
+            children_d[depth] = children
+            next_d[depth] = 0
+
+            # ## find the next child of the node at depth, go back to the parents if there are no children left ######
+            while True:
+                children = children_d[depth]
+                i = next_d[depth]
+                togo_phase2 = togo_start - depth
+                while i < len(children) and children[i][1] >= togo_phase2:  # cornslice pruning
+                    if counters is not None:
+                        counters['pruned_cornslice'] += 1
+                    i += 1
+                if i < len(children):
+                    next_d[depth] = i + 1
+                    dist, _, m, corners, ud_edges, slice_sorted = children[i]
+                    sofar.append(m)
+                    depth += 1
+                    togo_phase2 -= 1
+                    break
+                if depth == 0:
+                    return
+                depth -= 1
+                sofar.pop(-1)
+
+    def search_iterative(self, flip, twist, slice_sorted, dist, togo_phase1):
+        sofar = self.sofar_phase1
+        children_d, next_d, check_conj_d = self.children_phase1_d, self.next_phase1_d, self.check_conj_d
+        counters = self.counters
+        track = self.tt is not None and self.tt_exact
+        conj_bounds = self.conj_bounds
+        togo_start = togo_phase1
+        depth = 0
+        while True:
+            # ## enter the node (flip, twist, slice_sorted, dist) with togo_phase1 moves left #########################
+            children = ()  # as in search_phase2_iterative
+            if not self.stopped:
+                self.nodes += 1
+                if self.nodes >= self.next_check:
+                    self.check_budget()
+                if counters is not None:
+                    counters['nodes_phase1'][depth] += 1
+                if togo_phase1 == 0:  # phase 1 solved
+                    self.start_phase2(slice_sorted)
+                else:
+                    last = sofar[-1] if sofar else N_MOVE
+                    if self.tt is None or not self.tt_lookup(flip, twist, slice_sorted, togo_phase1, last, depth):
+                        if dist == 0 and togo_phase1 < 5:  # see search
+                            moves = self.next_moves_phase1_end[last]
+                        else:
+                            moves = self.next_moves_phase1[last]
+                        children = self.phase1_children(flip, twist, slice_sorted, dist, togo_phase1, moves)
+                        if counters is not None:
+                            counters['pruned_phase1'] += len(moves) - len(children)
+                        if self.ordered:
+                            children.sort()
+                        check_conj_d[depth] = conj_bounds and depth + 13 >= self.shortest_length[0]
+            children_d[depth] = children
+            next_d[depth] = 0
+
+            # ## find the next child of the node at depth, go back to the parents if there are no children left ######
+            while True:
+                children = children_d[depth]
+                i = next_d[depth]
+                check_conj = check_conj_d[depth]
+                while i < len(children):
+                    m = children[i][1]
+                    i += 1
+                    if check_conj:
+                        if self.prune_conj(depth, m):
+                            continue  # no shorter solution in this subtree
+                    elif conj_bounds and self.conj_valid > depth:
+                        self.conj_valid = depth
+                    break
+                else:
+                    if depth == 0:
+                        return
+                    depth -= 1
+                    sofar.pop(-1)
+                    continue
+                next_d[depth] = i
+                if track:
+                    self.corners_d[depth + 1] = mv.corners_move[18 * self.corners_d[depth] + m]
+                    self.u_edges_d[depth + 1] = mv.u_edges_move[18 * self.u_edges_d[depth] + m]
+                    self.d_edges_d[depth + 1] = mv.d_edges_move[18 * self.d_edges_d[depth] + m]
+                    self.valid_depth = depth + 1
+                elif self.valid_depth > depth:
+                    self.valid_depth = depth  # the move at this depth changes
+                dist, m, flip, twist, slice_sorted = children[i - 1]
+                sofar.append(m)
+                depth += 1
+                togo_phase1 = togo_start - depth
+                break
+
     def run(self):
         cb = None
         if self.rot == 0:  # no rotation
@@ -191,20 +685,127 @@ class SolverThread(thr.Thread):
 
         self.co_cube = coord.CoordCube(cb)  # the rotated/inverted cube in coordinate representation
 
+        self.corners_d[0] = self.co_cube.corners
+        self.u_edges_d[0] = self.co_cube.u_edges
+        self.d_edges_d[0] = self.co_cube.d_edges
+        self.valid_depth = 0
+        if self.conj_bounds:
+            self.conj_d[0] = []
+            for s1, s2 in ((32, 16), (16, 32)):  # the 120° and the 240° rotation
+                cc = cubie.CubieCube(sy.symCube[s1].cp, sy.symCube[s1].co, sy.symCube[s1].ep, sy.symCube[s1].eo)
+                cc.multiply(cb)
+                cc.multiply(sy.symCube[s2])
+                co_cube = coord.CoordCube(cc)
+                self.conj_d[0].append((co_cube.flip, co_cube.twist, co_cube.slice_sorted, co_cube.get_depth_phase1()))
+            self.conj_valid = 0
+
+        if self.max_nodes is not None:
+            self.check_budget()  # the other threads may already have used up the budget
         dist = self.co_cube.get_depth_phase1()
         for togo1 in range(dist, 20):  # iterative deepening, solution has at least dist moves
             self.sofar_phase1 = []
-            self.search(self.co_cube.flip, self.co_cube.twist, self.co_cube.slice_sorted, dist, togo1)
+            if self.tt is not None:
+                self.tt.clear()  # the entries are only valid within one iteration
+            self.phase1_search(self.co_cube.flip, self.co_cube.twist, self.co_cube.slice_sorted, dist, togo1)
+        self.lock.acquire()
+        self.stats[0] += self.nodes - self.nodes_reported  # report the remaining nodes
+        self.lock.release()
 #################################End class SolverThread#################################################################
 
 
-def solve(cubestring, max_length=50, timeout=10):
+class SolverProcess(mp_context.Process):
+    """Runs the search of a SolverThread in a separate process. Threads are serialized by the GIL, so with six
+    processes the six searches really run in parallel on a multicore machine."""
+
+    def __init__(self, cb_cube, rot, inv, ret_length, timeout, start_time, solutions, terminated, shortest_length,
+                 lock, kernel='recursive', deadline=None, max_nodes=None, stats=None, statistics=None, count=False,
+                 tt_size=0, tt_exact=True, conj_bounds=False, ordered=False):
+        """
+        The parameters are the same as for SolverThread, but the shared variables must be process-safe:
+        :param solutions: A list proxy of a multiprocessing manager
+        :param terminated: A multiprocessing event
+        :param shortest_length: A multiprocessing array of size 1, shared by all processes
+        :param lock: A multiprocessing lock
+        :param stats: A multiprocessing array of size 2, shared by all processes
+        :param statistics: If not None, a list proxy of a multiprocessing manager. The tuple (counters, tt_stats) of the
+         search is appended to it.
+        """
+        mp_context.Process.__init__(self)
+        self.search_args = (cb_cube, rot, inv, ret_length, timeout, start_time, solutions, terminated,
+                            shortest_length, lock, kernel, None, deadline, max_nodes, stats, count, tt_size, tt_exact,
+                            conj_bounds, ordered)
+        self.statistics = statistics
+
+    def run(self):
+        # the search is run directly in this process, no additional thread is started
+        th = SolverThread(*self.search_args)
+        th.run()
+        if self.statistics is not None:
+            self.statistics.append((th.counters, th.tt_stats))
+########################################################################################################################
+
+
+def solution_string(man):
+    """The string representation of a maneuver, e.g. 'R1 U2 F3 (3f)'."""
+    s = ''
+    for m in man:
+        s += m.name + ' '
+    return s + '(' + str(len(man)) + 'f)'
+
+
+def set_info(info, status, man, nodes, start_time):
+    """Fills the info dictionary of solve."""
+    if info is not None:
+        info['status'] = status
+        info['solution'] = None if man is None else solution_string(man)
+        info['nodes'] = nodes
+        info['time'] = time.monotonic() - start_time
+
+
+def solve(cubestring, max_length=50, timeout=10, processes=False, kernel='recursive', callback=None, terminated=None,
+          cache=None, deadline=None, max_nodes=None, info=None, count=False, tt_size=0, tt_exact=True,
+          conj_bounds=False, ordered=False, endgame_depth=0):
     """Solves a cube defined by its cube definition string.
      :param cubestring: The format of the string is given in the Facelet class defined in the file enums.py
      :param max_length: The function will return if a maneuver of length <= max_length has been found
      :param timeout: If the function times out, the best solution found so far is returned. If there has not been found
      any solution yet the computation continues until a first solution appears.
+     :param processes: If True, each of the up to six searches runs in its own process instead of a thread. The
+     shortest length found so far and the termination request are shared by all processes, so every process stops as
+     soon as one of them has found a solution with length <= max_length.
+     :param kernel: 'recursive', 'iterative' or 'numpy', the search kernel used by the threads. See SolverThread.
+     :param callback: If not None, callback(solution, length, elapsed) is called from the search threads each time a
+     shorter solution is found. solution has the format of the return value and elapsed is the time in seconds since
+     the start of the search. Not available with processes=True.
+     :param terminated: A threading.Event which stops the search when it is set by another thread. The best solution
+     found so far is returned. Not available with processes=True.
+     :param cache: If not None, a cache.SolutionCache. A cached solution with length <= max_length is returned without
+     a search, otherwise the solution found is stored in the cache.
+     :param deadline: If not None, a hard limit of the search time in seconds. Other than timeout, the search also stops
+     if no solution has been found yet. The limit is checked inside both search phases every CHECK_INTERVAL nodes.
+     :param max_nodes: If not None, the search stops after about max_nodes nodes, summed over all threads.
+     :param info: If not None, a dictionary which is filled with the results of the search:
+     'status': 'finished' if the target length was reached or the search was complete, 'timeout' if the timeout or the
+     deadline stopped the search, 'node_budget' if max_nodes stopped the search and 'stopped' if the search was stopped
+     by the terminated event. 'solution': the best solution found or None, 'nodes': the number of searched nodes and
+     'time': the time used in seconds.
+     If the search is stopped by deadline or max_nodes before any solution has been found an error string is returned.
+     :param count: If True, info['counters'] holds the search counters of all threads added up, see new_counters.
+     :param tt_size: If > 0, the maximal number of entries of the phase 1 transposition table of each thread. info['tt']
+     then holds the number of lookups, the hits, the hit rate and the number of entries which were not stored because
+     the table was full, summed over all threads.
+     :param tt_exact: See SolverThread.
+     :param conj_bounds: If True, phase 1 prunes with the lower bounds of the conjugated cubes, see SolverThread.
+     :param ordered: If True, the children of each node are searched in the order of their pruning distance, which
+     usually finds the first solution earlier, see SolverThread.
+     The options count, tt_size, conj_bounds and ordered can be combined with each other and with all kernels.
+     :param endgame_depth: If > 0, a cube which can be solved with at most endgame_depth moves is solved optimally by a
+     lookup in the endgame table without a search. The table is built on the first call with this depth, which takes a
+     few seconds for depth 5, see endgame.create_table.
     """
+    if processes and (callback is not None or terminated is not None):
+        raise ValueError('callback and terminated are not available with processes=True')
+    check_kernel(kernel)
     fc = face.FaceCube()
     s = fc.from_string(cubestring)
     if s != cubie.CUBE_OK:
@@ -213,15 +814,53 @@ def solve(cubestring, max_length=50, timeout=10):
     s = cc.verify()
     if s != cubie.CUBE_OK:
         return s  # Error in cubie cube
+    s_time = time.monotonic()
+
+    man = None
+    if endgame_depth > 0:
+        endgame.create_table(endgame_depth)
+        man = endgame.lookup(cc)  # the cube is close to solved, the lookup gives an optimal solution
+    if man is not None:
+        if callback is not None:
+            callback(solution_string(man), len(man), 0.)
+        set_info(info, STATUS[FINISHED], man, 0, s_time)
+        return solution_string(man)
+
+    if cache is not None:
+        man = cache.get(cc)
+        if man is not None and len(man) <= max_length:
+            if callback is not None:
+                callback(solution_string(man), len(man), 0.)
+            set_info(info, STATUS[FINISHED], man, 0, s_time)
+            return solution_string(man)
 
     my_threads = []
-    s_time = time.monotonic()
+    if deadline is not None:
+        deadline += s_time
+
+    report = None
+    if callback is not None:
+        def report(man):
+            callback(solution_string(man), len(man), time.monotonic() - s_time)
 
     # these mutable variables are modidified by all six threads
-    s_length = [999]
-    solutions = []
-    terminated = thr.Event()
-    terminated.clear()
+    manager = None
+    if processes:
+        manager = mp_context.Manager()
+        solutions = manager.list()
+        terminated = mp_context.Event()
+        lock = mp_context.Lock()
+        s_length = mp_context.Array('i', [999])
+        stats = mp_context.Array('q', [0, FINISHED])
+        statistics = manager.list() if count or tt_size > 0 else None
+    else:
+        solutions = []
+        stopped = terminated  # the search may be stopped by the caller
+        if terminated is None:
+            terminated = thr.Event()
+        lock = thr.Lock()
+        s_length = None  # each thread keeps its own shortest length
+        stats = [0, FINISHED]
     syms = cc.symmetries();
     if len(list(set([16, 20, 24, 28]) & set(syms))) > 0:  # we have some rotational symmetry along a long diagonal
         tr = [0, 3]  # so we search only one direction and the inverse
@@ -230,14 +869,164 @@ def solve(cubestring, max_length=50, timeout=10):
     if len(list(set(range(48, 96)) & set(syms))) > 0:  # we have some antisymmetry so we do not search the inverses
         tr = list(filter(lambda x: x < 3, tr))
     for i in tr:
-        th = SolverThread(cc, i % 3, i // 3, max_length, timeout, s_time, solutions, terminated, [999])
+        if processes:
+            th = SolverProcess(cc, i % 3, i // 3, max_length, timeout, s_time, solutions, terminated, s_length, lock,
+                               kernel, deadline, max_nodes, stats, statistics, count, tt_size, tt_exact,
+                               conj_bounds, ordered)
+        else:
+            th = SolverThread(cc, i % 3, i // 3, max_length, timeout, s_time, solutions, terminated, [999], lock,
+                              kernel, report, deadline, max_nodes, stats, count, tt_size, tt_exact,
+                              conj_bounds, ordered)
         my_threads.append(th)
         th.start()
     for t in my_threads:
         t.join()  # wait until all threads have finished
-    s = ''
+    if count or tt_size > 0:
+        statistics = list(statistics) if processes else [(t.counters, t.tt_stats) for t in my_threads]
+    if manager is not None:
+        solutions = list(solutions)  # copy the solutions before the manager process is shut down
+        manager.shutdown()
+    status = STATUS[stats[1]]
+    if stats[1] == FINISHED and not processes and stopped is not None and stopped.is_set() and \
+            (len(solutions) == 0 or len(solutions[-1]) > max_length):
+        status = 'stopped'
+    set_info(info, status, solutions[-1] if len(solutions) > 0 else None, stats[0], s_time)
+    if count and info is not None:
+        info['counters'] = merge_counters([c for c, tt in statistics])
+    if tt_size > 0 and info is not None:
+        lookups, hits, rejected = [sum(tt[i] for c, tt in statistics) for i in range(3)]
+        info['tt'] = {'lookups': lookups, 'hits': hits, 'hit_rate': hits / lookups if lookups else 0.,
+                      'rejected': rejected}
     if len(solutions) > 0:
-        for m in solutions[-1]:  # the last solution is the shortest
-            s += m.name + ' '
-    return s + '(' + str(len(s)//3) + 'f)'
-########################################################################################################################
\ No newline at end of file
+        if cache is not None:
+            cache.put(cc, solutions[-1])
+        return solution_string(solutions[-1])  # the last solution is the shortest
+    if stats[1] != FINISHED:  # stopped by deadline or max_nodes
+        return 'Error: No solution found within the ' + ('time limit.' if stats[1] == TIMEOUT else 'node budget.')
+    return solution_string([])
+
+
+def solve_between(cubestring_a, cubestring_b, max_length=50, timeout=10, **kwargs):
+    """Computes a maneuver which transforms the cube A into the cube B. The maneuver solves the cube B^-1*A, so the
+    search costs the same as solve.
+     :param cubestring_a: The start cube, the format of the string is given in the Facelet class in enums.py
+     :param cubestring_b: The target cube
+     :param max_length: See solve
+     :param timeout: See solve
+     :param kwargs: Further parameters of solve
+     :return: The maneuver in the format of solve, or an error string if one of the cubes is invalid.
+    """
+    cubes = []
+    for cubestring in (cubestring_a, cubestring_b):
+        fc = face.FaceCube()
+        s = fc.from_string(cubestring)
+        if s != cubie.CUBE_OK:
+            return s  # Error in facelet cube
+        cc = fc.to_cubie_cube()
+        s = cc.verify()
+        if s != cubie.CUBE_OK:
+            return s  # Error in cubie cube
+        cubes.append(cc)
+    cc = cubie.CubieCube()
+    cubes[1].inv_cubie_cube(cc)
+    cc.multiply(cubes[0])  # A * M = B  <=>  (B^-1 * A) * M = id
+    return solve(cc.to_facelet_cube().to_string(), max_length, timeout, **kwargs)
+
+
+def iter_solutions(cubestring, max_length=50, timeout=10, kernel='recursive'):
+    """Solves a cube and yields each improved solution as soon as it is found. The parameters are the same as for solve.
+     :return: A generator which yields (solution, length, elapsed) tuples with decreasing length. solution has the
+     format of the return value of solve, elapsed is the time in seconds since the start of the search. The search stops
+     when the generator is closed, e.g. if the caller leaves the for loop because the solution is good enough.
+    """
+    found = queue.Queue()
+    terminated = thr.Event()
+    result = []
+
+    def search():
+        result.append(solve(cubestring, max_length, timeout, kernel=kernel, callback=lambda *sol: found.put(sol),
+                            terminated=terminated))
+        found.put(None)  # search finished
+
+    th = thr.Thread(target=search)
+    th.start()
+    try:
+        while True:
+            sol = found.get()
+            if sol is None:
+                break
+            yield sol
+    finally:
+        terminated.set()
+        th.join()
+    if result[0].startswith('Error'):
+        raise ValueError(result[0])
+########################################################################################################################
+
+
+def _solve_indexed(task):
+    """Solves one cube in a worker process of a SolverPool and returns the result together with the index of the cube
+    in the input."""
+    idx, cubestring, max_length, timeout = task
+    return idx, solve(cubestring, max_length, timeout)
+
+
+class SolverPool:
+    """A pool of long-lived worker processes which solve many cubes in parallel.
+
+    The worker processes are started once and solve one cube after the other, so the tables are loaded only once per
+    worker (with fork they are even inherited from the parent process). Each worker solves its cube with the usual
+    search threads, so the throughput grows with the number of workers.
+    """
+    def __init__(self, workers=None):
+        """
+        :param workers: The number of worker processes. Default is the number of CPUs.
+        """
+        self.pool = mp_context.Pool(workers)
+
+    def solve_many(self, cubestrings, max_length=50, timeout=10):
+        """Solves the cubes given by an iterable of cube definition strings.
+        :param cubestrings: Iterable of cube definition strings
+        :param max_length: See solve
+        :param timeout: See solve
+        :return: A generator which yields (index, solution) tuples as soon as the solutions are found. index is the
+        position of the cube in cubestrings and solution is the string returned by solve.
+        """
+        tasks = ((i, s, max_length, timeout) for i, s in enumerate(cubestrings))
+        for result in self.pool.imap_unordered(_solve_indexed, tasks):
+            yield result
+
+    def solve_async(self, cubestring, max_length=50, timeout=10):
+        """Queues one cube. The parameters are the same as for solve.
+        :return: A multiprocessing AsyncResult, its get() method waits for the solution string.
+        """
+        return self.pool.apply_async(solve, (cubestring, max_length, timeout))
+
+    def close(self):
+        """Waits until all submitted cubes are solved and stops the worker processes."""
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        """Stops the worker processes immediately."""
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.terminate()
+
+
+def solve_many(cubestrings, max_length=50, timeout=10, workers=None):
+    """Solves many cubes with a pool of worker processes which lives as long as the returned generator.
+     :param cubestrings: Iterable of cube definition strings
+     :param max_length: See solve
+     :param timeout: See solve
+     :param workers: The number of worker processes. Default is the number of CPUs.
+     :return: A generator which yields (index, solution) tuples in the order the solutions are found.
+    """
+    with SolverPool(workers) as pool:
+        for result in pool.solve_many(cubestrings, max_length, timeout):
+            yield result
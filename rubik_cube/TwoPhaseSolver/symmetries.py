@@ -1,9 +1,9 @@
 # #################### Symmetry related functions. Symmetry considerations increase the performance of the solver.######
 
-from os import path
 import numpy as np
 import array as ar
 import cubie as cb
+import tables as tb
 from defs import N_TWIST, N_SYM, N_SYM_D4h, N_FLIP, N_SLICE, N_CORNERS, N_UD_EDGES, N_MOVE, N_FLIPSLICE_CLASS, \
     N_CORNERS_CLASS
 from enums import Corner as Co, Edge as Ed, Move as Mv, BS
@@ -96,11 +96,17 @@ for s in range(N_SYM):
         for m2 in Mv:
             if ss == cb.moveCube[m2]:
                 conj_move[m][s] = m2
+
+# A move m on a cube is the move conj_rot[r][m] on the cube conjugated by the 120° rotation r along the long diagonal,
+# see SolverThread.run. Rotation 1 is symCube[32] * cube * symCube[16], rotation 2 is symCube[16] * cube * symCube[32].
+conj_rot = [tuple(int(conj_move[m, 0]) for m in Mv), tuple(int(conj_move[m, 32]) for m in Mv),
+            tuple(int(conj_move[m, 16]) for m in Mv)]
 ########################################################################################################################
 
 # ####### generate the phase 1 table for the conjugation of the twist t by a symmetry s. twist_conj[t, s] = s*t*s^-1####
 fname = "conj_twist"
-if not path.isfile(fname):
+twist_conj = tb.load(fname, 'H', N_TWIST * N_SYM_D4h)
+if twist_conj is None:
     print('On the first run, several tables will be created. This takes from 1/2 hour (e.g. PC) to 6 hours '
           '(e.g. RaspberryPi3), depending on the hardware.')
     print("creating " + fname + " table...")
@@ -113,20 +119,13 @@ if not path.isfile(fname):
             ss.corner_multiply(cc)  # s*t
             ss.corner_multiply(symCube[inv_idx[s]])  # s*t*s^-1
             twist_conj[N_SYM_D4h * t + s] = ss.get_twist()
-    fh = open(fname, "wb")
-    twist_conj.tofile(fh)
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, 'rb')
-    twist_conj = ar.array('H')
-    twist_conj.fromfile(fh, N_TWIST * N_SYM_D4h)
-
-fh.close()
+    tb.save(fname, twist_conj)
 # ######################################################################################################################
 
 # #################### generate the phase 2 table for the conjugation of the URtoDB coordinate by a symmetrie###########
 fname = "conj_ud_edges"
-if not path.isfile(fname):
+ud_edges_conj = tb.load(fname, 'H', N_UD_EDGES * N_SYM_D4h)
+if ud_edges_conj is None:
     print("creating " + fname + " table...")
     ud_edges_conj = ar.array('H', [0] * (N_UD_EDGES * N_SYM_D4h))
     for t in range(N_UD_EDGES):
@@ -142,25 +141,21 @@ if not path.isfile(fname):
             ss.edge_multiply(symCube[inv_idx[s]])  # s*t*s^-1
             ud_edges_conj[N_SYM_D4h * t + s] = ss.get_ud_edges()
     print('')
-    fh = open(fname, "wb")
-    ud_edges_conj.tofile(fh)
-else:
-    print("loading " + fname + " table...")
-    fh = open(fname, "rb")
-    ud_edges_conj = ar.array('H')
-    ud_edges_conj.fromfile(fh, N_UD_EDGES * N_SYM_D4h)
-fh.close()
+    tb.save(fname, ud_edges_conj)
 # ######################################################################################################################
 
 # ############## generate the tables to handle the symmetry reduced flip-slice coordinate in  phase 1 ##################
 fname1 = "fs_classidx"
 fname2 = "fs_sym"
 fname3 = "fs_rep"
-if not (path.isfile(fname1) and path.isfile(fname2) and path.isfile(fname3)):
+flipslice_classidx = tb.load(fname1, 'H', N_FLIP * N_SLICE)  # idx -> classidx
+flipslice_sym = tb.load(fname2, 'B', N_FLIP * N_SLICE)  # idx -> symmetry
+flipslice_rep = tb.load(fname3, 'I', N_FLIPSLICE_CLASS)  # classidx -> idx of representant, 4 bytes everywhere
+if flipslice_classidx is None or flipslice_sym is None or flipslice_rep is None:
     print("creating " + "flipslice sym-tables...")
     flipslice_classidx = ar.array('H', [INVALID] * (N_FLIP * N_SLICE))  # idx -> classidx
     flipslice_sym = ar.array('B', [0] * (N_FLIP * N_SLICE))  # idx -> symmetry
-    flipslice_rep = ar.array('L', [0] * N_FLIPSLICE_CLASS)  # classidx -> idx of representant
+    flipslice_rep = ar.array('I', [0] * N_FLIPSLICE_CLASS)  # classidx -> idx of representant
 
     classidx = 0
     cc = cb.CubieCube()
@@ -191,38 +186,19 @@ if not (path.isfile(fname1) and path.isfile(fname2) and path.isfile(fname3)):
                     flipslice_sym[idx_new] = s
             classidx += 1
     print('')
-    fh = open(fname1, 'wb')
-    flipslice_classidx.tofile(fh)
-    fh.close()
-    fh = open(fname2, 'wb')
-    flipslice_sym.tofile(fh)
-    fh.close()
-    fh = open(fname3, 'wb')
-    flipslice_rep.tofile(fh)
-    fh.close()
-
-else:
-    print("loading " + "flipslice sym-tables...")
-
-    fh = open(fname1, 'rb')
-    flipslice_classidx = ar.array('H')
-    flipslice_classidx.fromfile(fh, N_FLIP * N_SLICE)
-    fh.close()
-    fh = open(fname2, 'rb')
-    flipslice_sym = ar.array('B')
-    flipslice_sym.fromfile(fh, N_FLIP * N_SLICE)
-    fh.close()
-    fh = open(fname3, 'rb')
-    flipslice_rep = ar.array('L')
-    flipslice_rep.fromfile(fh, N_FLIPSLICE_CLASS)
-    fh.close()
+    tb.save(fname1, flipslice_classidx)
+    tb.save(fname2, flipslice_sym)
+    tb.save(fname3, flipslice_rep)
 ########################################################################################################################
 
 # ############ generate the tables to handle the symmetry reduced corner permutation coordinate in phase 2##############
 fname1 = "co_classidx"
 fname2 = "co_sym"
 fname3 = "co_rep"
-if not (path.isfile(fname1) and path.isfile(fname2) and path.isfile(fname3)):
+corner_classidx = tb.load(fname1, 'H', N_CORNERS)  # idx -> classidx
+corner_sym = tb.load(fname2, 'B', N_CORNERS)  # idx -> symmetry
+corner_rep = tb.load(fname3, 'H', N_CORNERS_CLASS)  # classidx -> idx of representant
+if corner_classidx is None or corner_sym is None or corner_rep is None:
     print("creating " + "corner sym-tables...")
     corner_classidx = ar.array('H', [INVALID] * N_CORNERS)  # idx -> classidx
     corner_sym = ar.array('B', [0] * N_CORNERS)  # idx -> symmetry
@@ -252,29 +228,7 @@ if not (path.isfile(fname1) and path.isfile(fname2) and path.isfile(fname3)):
                 corner_sym[cp_new] = s
         classidx += 1
     print('')
-    fh = open(fname1, 'wb')
-    corner_classidx.tofile(fh)
-    fh.close()
-    fh = open(fname2, 'wb')
-    corner_sym.tofile(fh)
-    fh.close()
-    fh = open(fname3, 'wb')
-    corner_rep.tofile(fh)
-    fh.close()
-
-else:
-    print("loading " + "corner sym-tables...")
-
-    fh = open(fname1, 'rb')
-    corner_classidx = ar.array('H')
-    corner_classidx.fromfile(fh,N_CORNERS)
-    fh.close()
-    fh = open(fname2, 'rb')
-    corner_sym = ar.array('B')
-    corner_sym.fromfile(fh, N_CORNERS)
-    fh.close()
-    fh = open(fname3, 'rb')
-    corner_rep = ar.array('H')
-    corner_rep.fromfile(fh, N_CORNERS_CLASS)
-    fh.close()
+    tb.save(fname1, corner_classidx)
+    tb.save(fname2, corner_sym)
+    tb.save(fname3, corner_rep)
 ########################################################################################################################
@@ -0,0 +1,257 @@
+# ################# Loading and saving of the tables, also from compressed table bundles ###############################
+# A table is loaded from the raw file with its name, as written by tofile, or else from a member with its name in one
+# of the BUNDLES. A bundle is a zip file, each member starts with a header with the format version, the array type, the
+# number of entries and the CRC32 of the data. Members without header, like phase2_prun in phase2_prun.zip, are read as
+# raw files. A table which is missing or corrupt is not loaded, so it is created again.
+#
+# The tables do not depend on the current directory. They are searched in this order in
+# - TABLE_DIR, if it is set before the solver is imported,
+# - the directory in the environment variable TWOPHASE_TABLES,
+# - PACKAGE_DIR, the directory rubik_cube with the tables which come with the program,
+# - the per-user cache directory, for example ~/.cache/twophase/v1.
+# New tables are written to TABLE_DIR or TWOPHASE_TABLES if one of them is given, else to PACKAGE_DIR if it is writable,
+# else to the cache directory. A table is written to a temporary file which is then renamed, so other processes never
+# see a partly written table.
+#
+# Create a bundle from all tables with: python tables.py [tables.zip], by default in the directory for new tables.
+#
+# With MMAP set, the raw files are mapped into memory read-only instead of being read. A table is then a memoryview of
+# the file with the same indexing as the array, and all processes which use the tables share the same pages of the
+# operating system's page cache. Importing the solver needs almost no time and no private memory for the tables. Tables
+# which are loaded from a bundle or which are stored with the other 'L' width are written once as raw file in the native
+# format to the cache directory and then mapped, the cache directory is searched first with MMAP. The tables in the
+# other directories, like the tables which come with the program, are never replaced. Set MMAP before the solver is
+# imported, or set the environment variable TWOPHASE_MMAP=1, which also holds for worker processes which are started
+# with spawn.
+
+import array as ar
+import lzma
+import mmap
+import os
+import struct
+import sys
+import threading
+import zipfile
+import zlib
+from os import path
+
+MAGIC = b'TPST'
+VERSION = 1  # format version of the members of a bundle
+HEADER = struct.Struct('<4sHcBQI')  # magic, version, typecode, itemsize, number of entries, crc32 of the data
+BUNDLES = ('tables.zip', 'phase2_prun.zip')  # searched in this order in each table directory
+CHUNK = 1 << 20  # bytes read at once from a bundle
+MMAP = os.environ.get('TWOPHASE_MMAP', '') not in ('', '0')  # map the raw files read-only instead of reading them
+
+TABLE_DIR = None  # explicit directory of the tables, searched first
+PACKAGE_DIR = path.normpath(path.join(path.dirname(path.abspath(__file__)), path.pardir))
+
+loaded = {}  # name -> array of all tables loaded or saved in this process, written by make_bundle
+
+
+def cache_dir():
+    """The per-user cache directory of the tables, with the format version in its name."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or path.join(path.expanduser('~'), '.cache')
+    return path.join(base, 'twophase', 'v' + str(VERSION))
+
+
+def table_dirs():
+    """The directories in which the tables are searched, in this order. With MMAP the cache directory comes first, it
+    holds the tables converted for mapping."""
+    dirs = []
+    first = (cache_dir(),) if MMAP else ()
+    for d in first + (TABLE_DIR, os.environ.get('TWOPHASE_TABLES'), PACKAGE_DIR, cache_dir()):
+        if d and path.abspath(d) not in dirs:
+            dirs.append(path.abspath(d))
+    return dirs
+
+
+def write_dir():
+    """The directory to which new tables are written. It is created if it does not exist."""
+    d = TABLE_DIR or os.environ.get('TWOPHASE_TABLES')
+    if not d:
+        d = PACKAGE_DIR if os.access(PACKAGE_DIR, os.W_OK) else cache_dir()
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def _typecode(typecode, itemsize):
+    """The typecode of the same signedness as typecode with the given itemsize. The tables written on Windows have
+    4 byte 'L' entries, on Linux and macOS 'L' has 8 bytes."""
+    for tc in ('bhilq' if typecode.islower() else 'BHILQ'):
+        if ar.array(tc).itemsize == itemsize:
+            return tc
+    return None
+
+
+def _convert(typecode, stored_itemsize, data):
+    """Returns the bytes data written with entries of stored_itemsize as array of the typecode."""
+    a = ar.array(typecode)
+    if stored_itemsize == a.itemsize:
+        a.frombytes(data)
+        return a
+    stored = ar.array(_typecode(typecode, stored_itemsize))
+    stored.frombytes(data)
+    return ar.array(typecode, stored)
+
+
+def _stored_itemsize(typecode, count, nbytes):
+    """The itemsize with which a table without header was written, or None if nbytes does not fit."""
+    for itemsize in (ar.array(typecode).itemsize, 4, 8):
+        if nbytes == count * itemsize and _typecode(typecode, itemsize) is not None:
+            return itemsize
+    return None
+
+
+def _typecode_of(a):
+    """The typecode of the table a, which is an array or a memoryview of a mapped file."""
+    return a.typecode if isinstance(a, ar.array) else a.format
+
+
+def _map(name, typecode):
+    """Maps the raw file name read-only and returns it as memoryview with items of the typecode. The mapping stays
+    open as long as the memoryview is referenced."""
+    with open(name, 'rb') as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mm).cast(typecode)
+
+
+def _read_into(fh, a):
+    """Fills the array a from the file fh in chunks, without an intermediate copy of the whole table."""
+    buf = memoryview(a).cast('B')
+    pos = 0
+    while pos < len(buf):
+        n = fh.readinto(buf[pos:pos + CHUNK])
+        if not n:
+            raise EOFError('table too short')
+        pos += n
+
+
+def _read_member(zf, name, typecode, count):
+    with zf.open(name) as fh:
+        head = fh.read(HEADER.size)
+        if len(head) == HEADER.size and head[:4] == MAGIC:
+            magic, version, tc, itemsize, n, crc = HEADER.unpack(head)
+            if version != VERSION or tc.decode() != typecode or n != count:
+                raise ValueError('version %d, type %s, %d entries, expected version %d, type %s, %d entries' %
+                                 (version, tc.decode(), n, VERSION, typecode, count))
+            a = ar.array(_typecode(typecode, itemsize), [0]) * count  # the entries as they were written
+            _read_into(fh, a)
+            if fh.read(1) or zlib.crc32(a) != crc:
+                raise ValueError('checksum error')
+            return a if a.typecode == typecode else ar.array(typecode, a)
+        else:  # raw table, zipfile checks the CRC of the member
+            data = head + fh.read()
+            itemsize = _stored_itemsize(typecode, count, len(data))
+            if itemsize is None:
+                raise ValueError('%d bytes, expected %d entries' % (len(data), count))
+    return _convert(typecode, itemsize, data)
+
+
+def _load_from(d, name, typecode, count):
+    """Returns the table name from the raw file or from a bundle in the directory d, or None."""
+    fname = path.join(d, name)
+    if path.isfile(fname):
+        itemsize = _stored_itemsize(typecode, count, path.getsize(fname))
+        if itemsize is None:
+            print('table ' + fname + ' has the wrong size')
+        elif MMAP and itemsize == ar.array(typecode).itemsize:
+            print("mapping " + name + " table...")
+            return _map(fname, typecode)
+        else:
+            print("loading " + name + " table...")
+            with open(fname, 'rb') as fh:
+                if itemsize == ar.array(typecode).itemsize:
+                    a = ar.array(typecode)
+                    a.fromfile(fh, count)
+                else:
+                    a = _convert(typecode, itemsize, fh.read())
+            if MMAP:  # stored with the other 'L' width
+                return _save_and_map(name, a)
+            return a
+    for bundle in BUNDLES:
+        bundle = path.join(d, bundle)
+        if not path.isfile(bundle):
+            continue
+        try:
+            with zipfile.ZipFile(bundle) as zf:
+                if name not in zf.namelist():
+                    continue
+                print("loading " + name + " table from " + bundle + "...")
+                a = _read_member(zf, name, typecode, count)
+        except (OSError, EOFError, ValueError, zipfile.BadZipFile, zlib.error, lzma.LZMAError) as e:
+            print('table ' + name + ' in ' + bundle + ' is corrupt: ' + str(e))
+            continue
+        if MMAP:
+            return _save_and_map(name, a)
+        return a
+    return None
+
+
+def load(name, typecode, count):
+    """Returns the table name as array of the typecode with count entries, or None if the table is not found in any of
+    the table directories or is corrupt. With MMAP the table is returned as read-only memoryview of the mapped raw
+    file."""
+    for d in table_dirs():
+        a = _load_from(d, name, typecode, count)
+        if a is not None:
+            loaded[name] = a
+            return a
+    return None
+
+
+def write_atomic(filename, write, mode='wb'):
+    """Calls write(fh) with a temporary file which is then renamed to filename, so a crash or a concurrent writer
+    never leaves a partly written file. mode is 'wb' or 'w'."""
+    tmp = '%s.%d.%d.tmp' % (filename, os.getpid(), threading.get_ident())  # unique for each writer
+    try:
+        with open(tmp, mode) as fh:
+            write(fh)
+        os.replace(tmp, filename)
+    except BaseException:
+        if path.isfile(tmp):
+            os.remove(tmp)
+        raise
+
+
+def save(name, a):
+    """Writes the table a atomically to the raw file name in the directory for new tables and returns its path."""
+    filename = path.join(write_dir(), name)
+    write_atomic(filename, a.tofile)
+    loaded[name] = a
+    return filename
+
+
+def _save_and_map(name, a):
+    """Writes the table a as raw file in the native format to the cache directory and returns the mapping of the
+    file."""
+    d = cache_dir()
+    print('writing ' + name + ' as raw table for mapping to ' + d + '...')
+    os.makedirs(d, exist_ok=True)
+    filename = path.join(d, name)
+    write_atomic(filename, a.tofile)
+    a = _map(filename, a.typecode)
+    loaded[name] = a
+    return a
+
+
+def make_bundle(filename=None, compression=zipfile.ZIP_LZMA):
+    """Writes all tables loaded or saved in this process to the bundle filename, default is tables.zip in the directory
+    for new tables."""
+    if filename is None:
+        filename = path.join(write_dir(), 'tables.zip')
+    with zipfile.ZipFile(filename, 'w', compression) as zf:
+        for name, a in loaded.items():
+            data = a.tobytes()
+            head = HEADER.pack(MAGIC, VERSION, _typecode_of(a).encode(), a.itemsize, len(a), zlib.crc32(data))
+            zf.writestr(name, head + data)
+            print(name + ': ' + str(len(data)) + ' bytes')
+
+
+if __name__ == '__main__':
+    import face  # face must be imported before the other modules
+    import solver  # loads or creates all tables of the two-phase solver
+    import tables  # the module which has loaded the tables, not __main__
+    tables.make_bundle(*sys.argv[1:2])
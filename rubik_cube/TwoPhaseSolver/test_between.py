@@ -0,0 +1,52 @@
+# solve_between 的测试: 得到的解法 M 满足 A * M = B
+import sys
+import os
+import random
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import face
+import cubie
+from solver import solve_between
+
+
+def to_cubie(cubestring):
+    fc = face.FaceCube()
+    fc.from_string(cubestring)
+    return fc.to_cubie_cube()
+
+
+def random_cube(seed):
+    random.seed(seed)
+    cc = cubie.CubieCube()
+    cc.randomize()
+    return cc.to_facelet_cube().to_string()
+
+
+def apply_solution(cubestring, solution):
+    """返回执行解法字符串 solution 之后的魔方状态"""
+    cc = to_cubie(cubestring)
+    for m in solution[:solution.rfind('(')].split():
+        for _ in range(int(m[1])):
+            cc.multiply(cubie.basicMoveCube['URFDLB'.index(m[0])])
+    return cc.to_facelet_cube().to_string()
+
+
+def test_solve_between_random_cubes():
+    for seed in range(3):
+        a, b = random_cube(2 * seed), random_cube(2 * seed + 1)
+        solution = solve_between(a, b, 21, 5)
+        assert not solution.startswith('Error')
+        assert apply_solution(a, solution) == b
+
+
+def test_solve_between_same_cube():
+    a = random_cube(7)
+    assert solve_between(a, a).endswith('(0f)')
+
+
+def test_solve_between_invalid_cube():
+    a = random_cube(8)
+    assert solve_between(a, 'U' * 54).startswith('Error')
+    assert solve_between('U' * 54, a).startswith('Error')
@@ -0,0 +1,59 @@
+# SolutionCache 的测试: 魔方的 48 个对称变体及其逆共用一个缓存条目
+import sys
+import os
+import random
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import face  # face 必须在其他模块之前导入
+import cubie
+import symmetries as sy
+from cache import SolutionCache
+from defs import N_SYM
+
+
+def apply_maneuver(cc, man):
+    """返回 cc 执行 man 之后的新魔方"""
+    cc = cubie.CubieCube(cc.cp, cc.co, cc.ep, cc.eo)
+    for m in man:
+        cc.multiply(cubie.moveCube[m])
+    return cc
+
+
+def variants(cc):
+    """cc 的 96 个变体 s*cc*s^-1 及其逆"""
+    result = []
+    for s in range(N_SYM):
+        c = cubie.CubieCube(sy.symCube[s].cp, sy.symCube[s].co, sy.symCube[s].ep, sy.symCube[s].eo)
+        c.multiply(cc)
+        c.multiply(sy.symCube[sy.inv_idx[s]])
+        d = cubie.CubieCube()
+        c.inv_cubie_cube(d)
+        result += [c, d]
+    return result
+
+
+def test_all_variants_share_one_entry():
+    rnd = random.Random(1)
+    scramble = [rnd.randrange(18) for _ in range(12)]
+    cc = apply_maneuver(cubie.CubieCube(), scramble)
+    cache = SolutionCache()
+    cache.put(cc, [(m // 3) * 3 + 2 - m % 3 for m in reversed(scramble)])  # 打乱的逆解出 cc
+    for v in variants(cc):
+        man = cache.get(v)
+        assert man is not None
+        assert apply_maneuver(v, man) == cubie.CubieCube()
+    assert len(cache) == 1
+    assert cache.hits == 96 and cache.misses == 0
+
+
+def test_save_and_load(tmp_path):
+    filename = str(tmp_path / 'cache.json')
+    cc = apply_maneuver(cubie.CubieCube(), [0, 4, 8])  # U1 R2 F3
+    cache = SolutionCache(filename=filename)
+    cache.put(cc, [6, 4, 2])  # F1 R2 U3
+    cache.save()
+    assert os.listdir(str(tmp_path)) == ['cache.json']  # 没有遗留临时文件
+    man = SolutionCache(filename=filename).get(cc)
+    assert apply_maneuver(cc, man) == cubie.CubieCube()
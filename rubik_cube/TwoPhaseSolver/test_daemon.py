@@ -0,0 +1,57 @@
+# SolverDaemon 的测试: 错误的请求得到 400 应答, 连接不会被中断
+import sys
+import os
+import json
+import threading
+import urllib.request
+import urllib.error
+
+import pytest
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from daemon import SolverDaemon, SolverClient
+
+TEST_CUBE = "UUFUUFLLFUUURRRRRRFFRFFDFFDRRBDDBDDBLLDLLDLLDLBBUBBUBB"
+
+
+@pytest.fixture(scope='module')
+def daemon():
+    d = SolverDaemon(port=0, workers=1)  # 端口 0: 由操作系统选择空闲端口
+    t = threading.Thread(target=d.serve_forever, daemon=True)
+    t.start()
+    yield d
+    d.shutdown()
+    t.join()
+
+
+def post(daemon, body):
+    """发送原始请求体, 返回 (状态码, 应答)"""
+    url = 'http://%s:%d/solve' % daemon.server.server_address
+    req = urllib.request.Request(url, body, {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize('body', [b'not json', b'[1, 2]', b'"cube"', b'42', b'null', b'{}',
+                                  b'{"cube": null}', b'{"cube": 42}', b'{"cube": ["UUU"]}',
+                                  b'{"cubes": "UUU"}', b'{"cubes": [null]}', b'{"cubes": ["UUU", 1]}',
+                                  b'{"cube": "UUU", "max_length": "x"}', b'{"cube": "UUU", "max_length": 1e400}',
+                                  b'{"cube": "UUU", "timeout": null}'])
+def test_malformed_request(daemon, body):
+    code, response = post(daemon, body)
+    assert code == 400
+    assert 'error' in response
+
+
+def test_solve(daemon):
+    client = SolverClient(*daemon.server.server_address)
+    assert client.is_running()
+    solution = client.solve(TEST_CUBE, 20, 5)
+    assert solution.endswith('f)')
+    assert client.solve_many([TEST_CUBE, 'UUU'], 20, 5)[1].startswith('Error')
+    assert client.status()['solved'] == 3
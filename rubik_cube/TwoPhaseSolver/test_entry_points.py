@@ -0,0 +1,80 @@
+# 求解器入口的测试: iter_solutions, solve_many, SolverPool, processes=True 和残局表
+import sys
+import os
+
+import pytest
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import face  # face 必须在其他模块之前导入
+import cubie
+import solver
+from test_between import apply_solution, random_cube
+
+SOLVED = cubie.CubieCube().to_facelet_cube().to_string()
+
+
+def length(solution):
+    return int(solution[solution.rfind('(') + 1:-2])
+
+
+def test_iter_solutions():
+    cubestring = random_cube(11)
+    results = list(solver.iter_solutions(cubestring, 20, 10))
+    assert results
+    lengths = [n for sol, n, elapsed in results]
+    assert lengths == sorted(lengths, reverse=True) and len(set(lengths)) == len(lengths)  # 每个解都更短
+    for sol, n, elapsed in results:
+        assert apply_solution(cubestring, sol) == SOLVED
+        assert length(sol) == n and elapsed >= 0
+
+
+def test_iter_solutions_stops_early():
+    gen = solver.iter_solutions(random_cube(12), 16, 10)
+    sol, n, elapsed = next(gen)
+    gen.close()  # 停止搜索, 不等待超时
+    assert n > 16
+
+
+def test_iter_solutions_invalid_cube():
+    with pytest.raises(ValueError):
+        list(solver.iter_solutions('U' * 54))
+
+
+def test_processes():
+    cubestring = random_cube(13)
+    info = {}
+    sol = solver.solve(cubestring, 20, 10, processes=True, info=info)
+    assert apply_solution(cubestring, sol) == SOLVED
+    assert length(sol) <= 20 and info['status'] == 'finished'
+    with pytest.raises(ValueError):
+        solver.solve(cubestring, processes=True, callback=print)
+
+
+def test_solve_many():
+    cubes = [random_cube(seed) for seed in range(20, 23)] + ['U' * 54]
+    results = dict(solver.solve_many(cubes, 20, 10, workers=2))
+    assert sorted(results) == [0, 1, 2, 3]
+    for i in range(3):
+        assert apply_solution(cubes[i], results[i]) == SOLVED
+    assert results[3].startswith('Error')
+
+
+def test_solver_pool():
+    cubestring = random_cube(24)
+    with solver.SolverPool(1) as pool:
+        sol = pool.solve_async(cubestring, 20, 10).get(60)
+        assert list(pool.solve_many([cubestring], 20, 10))[0][0] == 0
+    assert apply_solution(cubestring, sol) == SOLVED
+
+
+def test_endgame_depth():
+    cc = cubie.CubieCube()
+    for m in (0, 4, 8):  # U1 R2 F3
+        cc.multiply(cubie.moveCube[m])
+    cubestring = cc.to_facelet_cube().to_string()
+    info = {}
+    sol = solver.solve(cubestring, 20, 10, endgame_depth=3, info=info)
+    assert sol == 'F1 R2 U3 (3f)'
+    assert info['nodes'] == 0  # 查表, 没有搜索
@@ -0,0 +1,42 @@
+# solve 的 deadline 和 max_nodes 的测试: 状态和节点数
+import sys
+import os
+
+import pytest
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import face  # face 必须在其他模块之前导入
+from solver import solve
+
+CUBE = 'DUUBULDBFRBFRRULLLBRDFFFBLURDBFDFDRFRULBLUFDURRBLBDUDL'
+
+
+@pytest.mark.parametrize('processes', [False, True])
+@pytest.mark.parametrize('max_nodes', [1, 100, 3000, 50000])
+def test_node_budget(max_nodes, processes):
+    info = {}
+    result = solve(CUBE, 16, 10, processes=processes, max_nodes=max_nodes, info=info)
+    assert info['status'] == 'node_budget'
+    assert max_nodes <= info['nodes'] <= max_nodes * 1.15  # 超出预算最多约八分之一
+    if info['solution'] is None:
+        assert result == 'Error: No solution found within the node budget.'
+    else:
+        assert result == info['solution']
+
+
+def test_deadline():
+    info = {}
+    result = solve(CUBE, 16, 10, deadline=0.05, info=info)
+    assert info['status'] == 'timeout'
+    assert info['time'] < 5
+    assert result == info['solution'] or result == 'Error: No solution found within the time limit.'
+
+
+def test_no_limit_reached():
+    info = {}
+    result = solve(CUBE, 21, 10, max_nodes=10 ** 7, deadline=60, info=info)
+    assert info['status'] == 'finished'
+    assert result == info['solution']
+    assert info['nodes'] < 10 ** 7
@@ -0,0 +1,49 @@
+# solve_optimal 的测试: 与残局表的最优步数一致, 多进程给出同样的长度
+import sys
+import os
+import random
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import face  # face 必须在其他模块之前导入
+import cubie
+import endgame
+from optimal import solve_optimal
+from test_between import apply_solution
+
+SOLVED = cubie.CubieCube().to_facelet_cube().to_string()
+
+
+def scramble(rnd, n):
+    cc = cubie.CubieCube()
+    for _ in range(n):
+        cc.multiply(cubie.moveCube[rnd.randrange(18)])
+    return cc
+
+
+def test_optimal_matches_endgame_table():
+    endgame.create_table(4)
+    rnd = random.Random(3)
+    for _ in range(30):
+        cc = scramble(rnd, rnd.randrange(1, 5))
+        cubestring = cc.to_facelet_cube().to_string()
+        solution = solve_optimal(cubestring)
+        assert apply_solution(cubestring, solution) == SOLVED
+        assert solution.endswith('(%df)' % len(endgame.lookup(cc)))
+
+
+def test_optimal_with_workers():
+    rnd = random.Random(4)
+    cubestring = scramble(rnd, 9).to_facelet_cube().to_string()
+    info1, info2 = {}, {}
+    solution1 = solve_optimal(cubestring, 1, info1)
+    solution2 = solve_optimal(cubestring, 2, info2)
+    assert apply_solution(cubestring, solution2) == SOLVED
+    assert solution1[solution1.rfind('('):] == solution2[solution2.rfind('('):]  # 同样的最优长度
+    assert info1['nodes'] > 0 and info2['nodes'] > 0
+
+
+def test_optimal_solved_and_invalid_cube():
+    assert solve_optimal(SOLVED) == '(0f)'
+    assert solve_optimal('U' * 54).startswith('Error')
@@ -0,0 +1,87 @@
+# 精确距离剪枝表的测试: 与 mod 3 表经 pr.distance 重建的距离一致
+import sys
+import os
+import random
+import subprocess
+
+import pytest
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import face  # face 必须在其他模块之前导入
+import coord
+import pruning as pr
+import symmetries as sy
+import tables
+from defs import N_TWIST, N_FLIP, N_PERM_4, N_UD_EDGES, N_FLIPSLICE_CLASS, N_CORNERS_CLASS
+
+SAMPLES = 300
+SOLVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_full_phase2_nibble_rejected():
+    # 完整的阶段2表的距离可达18, 不能放进4位
+    env = dict(os.environ, TWOPHASE_FULL_PHASE2='1', TWOPHASE_EXACT_PRUNING='nibble')
+    p = subprocess.run([sys.executable, '-c', 'import face, pruning'], cwd=SOLVER_DIR, env=env, capture_output=True,
+                       text=True)
+    assert p.returncode != 0
+    assert 'TWOPHASE_EXACT_PRUNING=byte' in p.stderr
+
+
+def test_pack_exact_rejects_large_distances():
+    np = pytest.importorskip('numpy')
+    import fastprun
+    dist = np.array([0, 14, 16, -1], dtype=np.int8)
+    with pytest.raises(ValueError):
+        fastprun._pack_exact(dist, 'nibble', 15)
+    table = fastprun._pack_exact(dist, 'byte', 19)
+    assert list(table) == [0, 14, 16, 19]
+
+
+if pr.EXACT:
+    pytest.skip('the mod 3 tables are only loaded without TWOPHASE_EXACT_PRUNING', allow_module_level=True)
+
+
+def exact_table(name, total, packing):
+    """读取已有的精确距离表, 不存在时跳过测试 (创建需要 NumPy 和一分钟左右)"""
+    per_byte = 2 if packing == 'nibble' else 1
+    a = tables.load(name + packing, 'B', -(-total // per_byte))
+    if a is None:
+        pytest.skip('table ' + name + packing + ' not found')
+    if packing == 'nibble':
+        return lambda ix: (a[ix >> 1] >> ((ix & 1) << 2)) & 15
+    return a.__getitem__
+
+
+@pytest.mark.parametrize('packing', ['nibble', 'byte'])
+def test_phase1_exact_table(packing):
+    get_depth = exact_table('phase1_prun_', N_FLIPSLICE_CLASS * N_TWIST, packing)
+    rnd = random.Random(1)
+    for _ in range(SAMPLES):
+        ix = rnd.randrange(N_FLIPSLICE_CLASS * N_TWIST)
+        classidx, twist = divmod(ix, N_TWIST)
+        flipslice = sy.flipslice_rep[classidx]  # 代表元的对称为 0, 所以 ix 的 twist 不需要共轭
+        co = coord.CoordCube()
+        co.flip, co.twist, co.slice_sorted = flipslice % N_FLIP, twist, flipslice // N_FLIP * N_PERM_4
+        depth = co.get_depth_phase1()  # 由 mod 3 表逐步走到 H 得到的距离
+        assert get_depth(ix) == depth
+        assert pr.get_flipslice_twist_depth3(ix) == depth % 3
+
+
+@pytest.mark.parametrize('packing', ['nibble', 'byte'])
+def test_phase2_exact_table(packing):
+    if pr.FULL_PHASE2 and packing == 'nibble':
+        pytest.skip('the complete phase 2 table is only byte packed')
+    name = 'phase2_prun_full_' if pr.FULL_PHASE2 else 'phase2_prun_'
+    get_depth = exact_table(name, N_CORNERS_CLASS * N_UD_EDGES, packing)
+    rnd = random.Random(2)
+    for _ in range(SAMPLES):
+        ix = rnd.randrange(N_CORNERS_CLASS * N_UD_EDGES)
+        classidx, ud_edges = divmod(ix, N_UD_EDGES)
+        depth = coord.CoordCube.get_depth_phase2(sy.corner_rep[classidx], ud_edges)
+        if depth > pr.PHASE2_MAX_LENGTH:  # 表中没有填入的条目
+            assert get_depth(ix) == pr.UNFILLED
+        else:
+            assert get_depth(ix) == depth
+            assert pr.get_corners_ud_edges_depth3(ix) == depth % 3
@@ -0,0 +1,89 @@
+# tables.py 的测试: 表包 (bundle) 的读取和损坏的表包被拒绝
+import sys
+import os
+import array as ar
+import zipfile
+
+import pytest
+
+# 添加 TwoPhaseSolver 到路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tables
+
+N = 5000
+
+
+@pytest.fixture
+def table_dir(tmp_path, monkeypatch):
+    """只在临时目录中查找和写入表"""
+    monkeypatch.setattr(tables, 'TABLE_DIR', str(tmp_path))
+    monkeypatch.setattr(tables, 'PACKAGE_DIR', str(tmp_path))
+    monkeypatch.setattr(tables, 'MMAP', False)
+    monkeypatch.setattr(tables, 'cache_dir', lambda: str(tmp_path))
+    monkeypatch.setattr(tables, 'loaded', {'test_table': ar.array('H', [i % 7919 for i in range(N)])})
+    return tmp_path
+
+
+def make_bundle(table_dir):
+    filename = str(table_dir / 'tables.zip')
+    tables.make_bundle(filename, zipfile.ZIP_STORED)  # 不压缩, 数据在文件中的位置可以直接修改
+    tables.loaded = {}
+    return filename
+
+
+def test_bundle_round_trip(table_dir):
+    expected = tables.loaded['test_table']
+    make_bundle(table_dir)
+    assert tables.load('test_table', 'H', N) == expected
+    assert tables.load('test_table', 'H', N + 1) is None  # 条目数不对
+
+
+def test_corrupted_bundle_is_rejected(table_dir):
+    filename = make_bundle(table_dir)
+    with open(filename, 'r+b') as fh:
+        data = fh.read()
+        pos = data.index(tables.MAGIC) + tables.HEADER.size + 1000  # 表数据中间的一个字节
+        fh.seek(pos)
+        fh.write(bytes([data[pos] ^ 0xff]))
+    assert tables.load('test_table', 'H', N) is None
+
+
+def test_truncated_bundle_is_rejected(table_dir):
+    filename = make_bundle(table_dir)
+    with open(filename, 'r+b') as fh:
+        fh.truncate(os.path.getsize(filename) // 2)
+    assert tables.load('test_table', 'H', N) is None
+
+
+def test_raw_table_with_wrong_size_is_rejected(table_dir):
+    tables.save('test_table', ar.array('H', range(N)))
+    assert tables.load('test_table', 'H', N) == ar.array('H', range(N))
+    assert tables.load('test_table', 'H', N - 1) is None
+    assert [f for f in os.listdir(str(table_dir)) if f.endswith('.tmp')] == []  # 原子写入没有遗留临时文件
+
+
+def test_mmap_does_not_replace_package_tables(tmp_path, monkeypatch):
+    # 以另一种 'L' 宽度保存的表和表包中的表被转换后写入缓存目录, 程序自带的表不被修改
+    package, cache = tmp_path / 'package', tmp_path / 'cache'
+    package.mkdir()
+    monkeypatch.setattr(tables, 'TABLE_DIR', None)
+    monkeypatch.delenv('TWOPHASE_TABLES', raising=False)
+    monkeypatch.setattr(tables, 'PACKAGE_DIR', str(package))
+    monkeypatch.setattr(tables, 'MMAP', True)
+    monkeypatch.setattr(tables, 'cache_dir', lambda: str(cache))
+    expected = ar.array('L', range(N))
+    other = tables._typecode('L', 4 if expected.itemsize == 8 else 8)
+    with open(str(package / 'test_table'), 'wb') as fh:
+        ar.array(other, expected).tofile(fh)
+    monkeypatch.setattr(tables, 'loaded', {'bundled': ar.array('H', range(N))})
+    tables.make_bundle(str(package / 'tables.zip'))
+    before = {f.name: f.read_bytes() for f in package.iterdir()}
+
+    for name, typecode in (('test_table', 'L'), ('bundled', 'H')):
+        a = tables.load(name, typecode, N)
+        assert isinstance(a, memoryview)
+        assert a.tolist() == list(range(N))
+        assert (cache / name).is_file()
+        a.release()
+    assert {f.name: f.read_bytes() for f in package.iterdir()} == before
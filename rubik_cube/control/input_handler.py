@@ -130,15 +130,11 @@ class InputHandler:
         print("魔方已重置")
 
     def _on_solve_button_click(self):
-        """求解按钮回调：使用两阶段算法求解"""
+        """求解按钮回调：使用两阶段算法求解，解法在后台线程中计算，完成后由主循环加入动画队列"""
         if self.solver_controller and not self.animation_queue.current_animation:
             print("开始使用两阶段算法求解魔方...")
-            solution = self.solver_controller.solve_cube()
-            if solution:
-                self.cube.clear_history() 
-                print(f"求解完成，共 {len(solution)} 步")
-            else:
-                print("求解失败或未找到解法")
+            self.solver_controller.request_solve()
+            glutPostRedisplay()
 
     def keyboard(self, key: bytes, x: int, y: int):
         """键盘事件：字母键 = 顺时针，Shift+字母 = 逆时针"""
@@ -184,14 +180,7 @@ class InputHandler:
                         print(f"UI显示: {'开' if self.ui_manager.is_visible else '关'}")
                 elif action == 'SOLVE_TWO_PHASE':
                     # 使用两阶段算法求解
-                    if self.solver_controller and not self.animation_queue.current_animation:
-                        print("开始使用两阶段算法求解魔方...")
-                        solution = self.solver_controller.solve_cube()
-                        if solution:
-                            self.cube.clear_history() 
-                            print(f"求解完成，共 {len(solution)} 步")
-                        else:
-                            print("求解失败或未找到解法")
+                    self._on_solve_button_click()
                 elif action == 'SOLVE':
                     self._on_undo_all_button_click()          # 回溯法求解
                 else:
@@ -2,39 +2,147 @@
 from control.cube_adapter import CubeAdapter
 from model.cube import RubiksCube
 from control.animation import AnimationQueue
+import queue
 import sys
 import os
+import threading
+import functools
+
+# 求解器状态
+LOADING = 'loading'  # 后台线程正在加载表
+READY = 'ready'
+UNAVAILABLE = 'unavailable'  # 无法导入求解器
 
 
 class SolverController:
-    """控制两阶段算法求解的控制器"""
+    """控制两阶段算法求解的控制器
+
+    导入 solver 会加载所有表，需要几秒钟。为了不阻塞渲染循环，求解器在后台线程中初始化，
+    求解也在这个线程中进行。request_solve 只把请求放入队列，加载完成前的请求会在队列中等待。
+    求解结果由主线程调用 poll 取出并加入动画队列。
+    """
 
-    def __init__(self, cube: RubiksCube, animation_queue: AnimationQueue):
+    def __init__(self, cube: RubiksCube, animation_queue: AnimationQueue, use_daemon: bool = False):
         self.cube = cube
+        self.use_daemon = use_daemon  # 优先使用已运行的求解守护进程 (TwoPhaseSolver/daemon.py)
         self.animation_queue = animation_queue
         self.adapter = CubeAdapter(cube)
         self.solver = None
+        self.solve_func = None
+        self.status = LOADING
+        self.pending = 0  # 队列中和正在求解的请求数
+        self.requests = queue.Queue()  # 魔方状态字符串，由后台线程求解
+        self.results = queue.Queue()  # (魔方状态字符串, 解法步骤列表)，由主线程应用
+        self.worker = threading.Thread(target=self._worker, name='solver-warmup', daemon=True)
+        self.worker.start()
+
+    def _worker(self):
+        """后台线程：初始化求解器，然后依次处理求解请求"""
         self._initialize_solver()
+        self.status = READY if self.solve_func else UNAVAILABLE
+        while True:
+            cube_string = self.requests.get()
+            moves = self._solve(cube_string)
+            self.results.put((cube_string, moves))
 
     def _initialize_solver(self):
-        """初始化两阶段求解器"""
+        """初始化两阶段求解器，在后台线程中运行"""
         try:
             # 添加两阶段算法路径
             solver_path = os.path.join(os.path.dirname(__file__), '..', 'TwoPhaseSolver')
             if solver_path not in sys.path:
                 sys.path.insert(0, solver_path)
 
+            if self.use_daemon:
+                # 守护进程已加载所有表，客户端不需要导入求解器
+                from daemon import SolverClient
+                client = SolverClient()
+                if client.is_running():
+                    self.solve_func = client.solve
+                    print("使用求解守护进程")
+                    return
+                print("求解守护进程未运行，使用本进程内的求解器")
+
             # 导入两阶段算法模块
             from solver import solve
-            self.solve_func = solve
+            import endgame
+            endgame.create_table()  # 在后台线程中预先建立残局表
+            # 离解决状态很近的魔方直接查表
+            self.solve_func = functools.partial(solve, endgame_depth=endgame.DEPTH)
             print("两阶段求解器初始化成功")
         except ImportError as e:
             print(f"无法导入两阶段求解器: {e}")
             self.solve_func = None
+        except Exception as e:  # 例如表文件损坏，后台线程中的异常不能让状态停留在加载中
+            print(f"两阶段求解器初始化失败: {e}")
+            self.solve_func = None
+
+    def status_text(self) -> str:
+        """界面上显示的求解器状态"""
+        if self.status == LOADING:
+            text = "Solver: loading tables..."
+        elif self.status == UNAVAILABLE:
+            return "Solver: unavailable"
+        elif self.pending:
+            text = "Solver: solving..."
+        else:
+            return "Solver: ready"
+        if self.pending:
+            text += f" ({self.pending} queued)"
+        return text
+
+    def request_solve(self) -> bool:
+        """
+        在主线程中调用：记录当前魔方状态并放入求解队列，立即返回
+        求解器还在加载时，请求在队列中等待。返回False表示请求未被接受
+        """
+        if self.status == UNAVAILABLE:
+            print("两阶段求解器未初始化")
+            return False
+
+        # 获取魔方状态字符串
+        cube_string = self.adapter.get_cube_string()
+        print(f"魔方状态: {cube_string}")
+
+        # 验证魔方状态长度
+        if len(cube_string) != 54:
+            print(f"错误：魔方状态字符串长度不正确，应为54，实际为{len(cube_string)}")
+            return False
+
+        if self.status == LOADING:
+            print("求解器正在加载，求解请求已加入队列")
+        self.pending += 1
+        self.requests.put(cube_string)
+        return True
+
+    def poll(self) -> list:
+        """
+        在主线程中每帧调用：把已完成的解法添加到动画队列
+        返回本次应用的解法列表
+        """
+        applied = []
+        while True:
+            try:
+                cube_string, moves = self.results.get_nowait()
+            except queue.Empty:
+                return applied
+            self.pending -= 1
+            if not moves:
+                print("求解失败或未找到解法")
+                continue
+            if self.adapter.get_cube_string() != cube_string or self.animation_queue.current_animation:
+                print("魔方在求解期间被改变，丢弃解法")  # 解法只对请求时的状态有效
+                continue
+
+            # 将解法添加到动画队列
+            self.animation_queue.add_solution(moves)
+            self.cube.clear_history()
+            print(f"已添加 {len(moves)} 步解法到动画队列")
+            applied.append(moves)
 
-    def solve_cube(self) -> list:
+    def _solve(self, cube_string: str) -> list:
         """
-        使用两阶段算法求解魔方，并将结果添加到动画队列
+        在后台线程中使用两阶段算法求解魔方
         返回求解步骤列表
         """
         if not self.solve_func:
@@ -42,15 +150,6 @@ class SolverController:
             return []
 
         try:
-            # 获取魔方状态字符串
-            cube_string = self.adapter.get_cube_string()
-            print(f"魔方状态: {cube_string}")
-
-            # 验证魔方状态长度
-            if len(cube_string) != 54:
-                print(f"错误：魔方状态字符串长度不正确，应为54，实际为{len(cube_string)}")
-                return []
-
             # 调用两阶段算法求解
             solution_str = self.solve_func(cube_string, 50, 10)  # max_length=20, timeout=5秒
             print(f"求解结果: {solution_str}")
@@ -69,13 +168,6 @@ class SolverController:
                 print("求解结果包含无效移动")
                 return []
 
-            # 将解法添加到动画队列
-            if valid_moves:
-                self.animation_queue.add_solution(valid_moves)
-                print(f"已添加 {len(valid_moves)} 步解法到动画队列")
-            else:
-                print("未找到有效解法")
-
             return valid_moves
 
         except Exception as e:
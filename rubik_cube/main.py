@@ -28,6 +28,9 @@ input_handler.bind_renderer(renderer)
 input_handler.bind_ui_manager(ui_manager)  
 renderer.bind_ui_manager(ui_manager) 
 
+# 求解控制器，在 main 中创建
+solver_controller = None
+
 # 帧率控制
 last_time = time.time()
 
@@ -45,6 +48,10 @@ def display():
     delta_time = current_time - last_time
     last_time = current_time
 
+    # 应用后台线程完成的解法
+    if solver_controller:
+        solver_controller.poll()
+
     # 更新动画
     animation_queue.update(delta_time)
 
@@ -87,28 +94,31 @@ def reshape(width, height):
 
 
 def main():
-    global cube, renderer, animation_queue, input_handler, ui_manager
+    global cube, renderer, animation_queue, input_handler, ui_manager, solver_controller
+
+    # 初始化所有组件
+    cube = RubiksCube()
+    animation_queue = AnimationQueue(cube)
+
+    # 创建求解控制器，求解器在后台线程中加载表，不阻塞窗口创建和渲染
+    # 命令行参数 --daemon: 使用已运行的求解守护进程 (TwoPhaseSolver/daemon.py)
+    solver_controller = SolverController(cube, animation_queue, use_daemon='--daemon' in sys.argv)
 
     glutInit(sys.argv)
     glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
     glutInitWindowSize(800, 600)
     glutCreateWindow(b"Interactive Rubik's Cube")
 
-    # 初始化所有组件
-    cube = RubiksCube()
     renderer = Renderer()
-    animation_queue = AnimationQueue(cube)
     input_handler = InputHandler(cube, animation_queue)
     ui_manager = UIManager(800, 600)
 
-    # 创建求解控制器
-    solver_controller = SolverController(cube, animation_queue)  # 新增
-
     # 绑定组件
     input_handler.bind_camera(renderer.camera)
     input_handler.bind_renderer(renderer)
     input_handler.bind_ui_manager(ui_manager)
     input_handler.bind_solver_controller(solver_controller)  # 新增
+    ui_manager.bind_solver_controller(solver_controller)  # 显示求解器状态
     renderer.bind_input_handler(input_handler)
     renderer.bind_ui_manager(ui_manager)
 
@@ -130,10 +130,44 @@ class UIManager:
         for button in self.buttons:
             button.draw(self.window_width, self.window_height)
 
+        # 绘制求解器状态
+        if self.solver_controller:
+            self._draw_solver_status()
+
         # 绘制使用说明面板
         if self.show_instructions:
             self._draw_instructions_panel()
 
+    def _draw_solver_status(self):
+        """在按钮下方绘制求解器状态（加载中/就绪/求解中）"""
+        glPushAttrib(GL_ALL_ATTRIB_BITS)
+
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        glOrtho(0, self.window_width, 0, self.window_height, -1, 1)
+
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        glDisable(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+
+        if self.solver_controller.status == 'ready':
+            glColor3f(0.4, 0.9, 0.4)
+        else:
+            glColor3f(0.9, 0.8, 0.3)
+        glRasterPos2f(0.02 * self.window_width, 0.40 * self.window_height)
+        for char in self.solver_controller.status_text():
+            glutBitmapCharacter(glut.GLUT_BITMAP_9_BY_15, ord(char))
+
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopAttrib()
+
     def _draw_instructions_panel(self):
         """绘制使用说明面板"""
         # 保存当前OpenGL状态
@@ -346,7 +380,7 @@ class UIManager:
     def _on_solve_clicked(self):
         """求解按钮点击处理"""
         if self.solver_controller:
-            self.solver_controller.solve_cube()
+            self.solver_controller.request_solve()
         elif self.solve_callback:
             self.solve_callback()
 